@@ -1,11 +1,20 @@
 # app.py
-from service import lead_service
+import sys
+from datetime import date, timedelta
 from models import Lead, QualifiedLead
+from metrics import metrics
 
 class CRMApp:
     """Classe principal da aplicação CRM"""
     
+    SEARCH_LIMIT = 50
+    PAGE_SIZE = 20
+    TOP_LEADS_DEFAULT = 50
+    COHORT_WEEKS_DEFAULT = 12
+    SEARCH_FIELD_OPTIONS = {"n": "name", "e": "company", "m": "email"}
+    
     def __init__(self):
+        from service import lead_service
         self.service = lead_service
         self.running = False
     
@@ -22,6 +31,10 @@ class CRMApp:
         print("[6] Estatísticas")
         print("[7] Promover lead para qualificado")
         print("[8] Exportar para CSV")
+        print("[9] Métricas de desempenho")
+        print("[10] Ranking por score")
+        print("[11] Duplicados")
+        print("[12] Coortes semanais")
         print("[0] Sair")
         print("="*50)
     
@@ -56,31 +69,54 @@ class CRMApp:
             print(f"Erro inesperado: {e}")
     
     def list_leads_interaction(self, qualified_only=False):
-        """Exibe lista de leads formatada"""
+        """Exibe lista de leads formatada, página a página"""
         try:
-            if qualified_only:
-                leads = self.service.list_qualified()
-                title = "LEADS QUALIFICADOS"
-            else:
-                leads = self.service.list_all()
-                title = "TODOS OS LEADS"
-            
-            if not leads:
-                print(f"Nenhum lead{' qualificado ' if qualified_only else ' '}encontrado.")
-                return
-            
-            print(f"\n{title}")
-            print("="*80)
-            print(f"{'#':2} | {'Tipo':<10} | {'Nome':<20} | {'Empresa':<18} | {'E-mail':<20} | {'Info':<10}")
-            print("-" * 80)
+            title = "LEADS QUALIFICADOS" if qualified_only else "TODOS OS LEADS"
+            qualified = True if qualified_only else None
+            stats = self.service.get_stats()
+            total = stats["qualified"] if qualified_only else stats["total"]
             
-            for i, lead in enumerate(leads):
-                lead_type = "Qualificado" if isinstance(lead, QualifiedLead) else "Regular"
-                extra_info = f"Score: {lead.score}" if isinstance(lead, QualifiedLead) else lead.stage
+            # Pilha de cursores das páginas já vistas, para voltar
+            cursors = [None]
+            while True:
+                page = self.service.list_page(cursors[-1], self.PAGE_SIZE, qualified=qualified)
+                leads = page["items"]
                 
-                print(f"{i:02d} | {lead_type:<10} | {lead.name:<20} | {lead.company:<18} | {lead.email:<20} | {extra_info:<10}")
-            
-            print(f"\nTotal: {len(leads)} lead(s)")
+                if not leads and len(cursors) == 1:
+                    print(f"Nenhum lead{' qualificado ' if qualified_only else ' '}encontrado.")
+                    return
+                
+                page_number = len(cursors)
+                print(f"\n{title} - página {page_number}")
+                print("="*80)
+                print(f"{'#':2} | {'Tipo':<10} | {'Nome':<20} | {'Empresa':<18} | {'E-mail':<20} | {'Info':<10}")
+                print("-" * 80)
+                
+                offset = (page_number - 1) * self.PAGE_SIZE
+                for i, lead in enumerate(leads, start=offset):
+                    lead_type = "Qualificado" if isinstance(lead, QualifiedLead) else "Regular"
+                    extra_info = f"Score: {lead.score}" if isinstance(lead, QualifiedLead) else lead.stage
+                    
+                    print(f"{i:02d} | {lead_type:<10} | {lead.name:<20} | {lead.company:<18} | {lead.email:<20} | {extra_info:<10}")
+                
+                print(f"\nTotal: {total} lead(s)")
+                if page["next_cursor"] is None and page_number == 1:
+                    return
+                
+                options = []
+                if page["next_cursor"] is not None:
+                    options.append("[n] próxima")
+                if page_number > 1:
+                    options.append("[p] anterior")
+                options.append("[Enter] voltar ao menu")
+                choice = input(" | ".join(options) + ": ").strip().lower()
+                
+                if choice == "n" and page["next_cursor"] is not None:
+                    cursors.append(page["next_cursor"])
+                elif choice == "p" and page_number > 1:
+                    cursors.pop()
+                else:
+                    return
                 
         except Exception as e:
             print(f"Erro ao listar leads: {e}")
@@ -93,19 +129,29 @@ class CRMApp:
                 print("Digite um termo para buscar.")
                 return
             
-            results = self.service.search(query)
+            field_input = input("Campo [n]ome, [e]mpresa, e-[m]ail (Enter = todos): ").strip().lower()
+            field = self.SEARCH_FIELD_OPTIONS.get(field_input)
+            
+            # Busca um a mais que o limite para saber se houve corte
+            results = self.service.search(query, field=field, limit=self.SEARCH_LIMIT + 1)
             
             if not results:
                 print("Nenhum lead encontrado com esses critérios.")
                 return
             
+            truncated = len(results) > self.SEARCH_LIMIT
+            results = results[:self.SEARCH_LIMIT]
+            
             print(f"\nRESULTADOS DA BUSCA: '{query}'")
             print("="*60)
             for i, lead in enumerate(results):
                 lead_type = "[Q]" if isinstance(lead, QualifiedLead) else "[R]"
                 print(f"{i+1:2d}. {lead_type} {lead.name} | {lead.company} | {lead.email}")
             
-            print(f"\nEncontrados: {len(results)} lead(s)")
+            if truncated:
+                print(f"\nExibindo os primeiros {self.SEARCH_LIMIT} resultados. Refine a busca.")
+            else:
+                print(f"\nEncontrados: {len(results)} lead(s)")
             
         except Exception as e:
             print(f"Erro na busca: {e}")
@@ -126,6 +172,11 @@ class CRMApp:
                 high_value_rate = (stats['high_value'] / stats['total']) * 100
                 print(f"Taxa de qualificação: {qual_rate:.1f}%")
                 print(f"Taxa de high-value: {high_value_rate:.1f}%")
+            
+            print("\nFUNIL POR ESTÁGIO")
+            print("-"*30)
+            for step in self.service.get_funnel():
+                print(f"{step['name']:<18} {step['count']:>6} ({step['percent']:.1f}%)")
                 
         except Exception as e:
             print(f"Erro ao gerar estatísticas: {e}")
@@ -150,18 +201,116 @@ class CRMApp:
         except Exception as e:
             print(f"Erro inesperado: {e}")
     
+    def score_ranking_interaction(self):
+        """Top leads por score ou leads em uma faixa de score"""
+        try:
+            mode = input("\n[t] Top leads  [f] Faixa de score: ").strip().lower()
+            if mode == "f":
+                low = int(input("Score mínimo: ").strip())
+                high = int(input("Score máximo: ").strip())
+                leads = self.service.leads_in_score_range(low, high)
+                title = f"LEADS COM SCORE ENTRE {low} E {high}"
+            else:
+                k_input = input(f"Quantidade (padrão {self.TOP_LEADS_DEFAULT}): ").strip()
+                k = int(k_input) if k_input else self.TOP_LEADS_DEFAULT
+                leads = self.service.top_leads(k)
+                title = f"TOP {k} LEADS POR SCORE"
+            
+            if not leads:
+                print("Nenhum lead qualificado encontrado.")
+                return
+            
+            print(f"\n{title}")
+            print("="*70)
+            print(f"{'#':>3} | {'Score':>5} | {'Nome':<20} | {'Empresa':<18} | {'E-mail':<20}")
+            print("-" * 70)
+            for i, lead in enumerate(leads, start=1):
+                print(f"{i:>3} | {lead.score:>5} | {lead.name:<20} | {lead.company:<18} | {lead.email:<20}")
+            print(f"\n{len(leads)} lead(s)")
+            
+        except ValueError as e:
+            print(f"Erro: {e}")
+        except Exception as e:
+            print(f"Erro no ranking: {e}")
+    
+    def duplicates_interaction(self):
+        """Lista prováveis duplicatas e, se confirmado, mescla os grupos"""
+        try:
+            report = self.service.find_duplicates()
+            if not report["groups"]:
+                print("\nNenhuma duplicata encontrada.")
+                return
+            
+            print(f"\nPROVÁVEIS DUPLICATAS ({len(report['groups'])} grupo(s))")
+            print("="*70)
+            for group in report["groups"][:self.SEARCH_LIMIT]:
+                print(f"Manter: {group['survivor']}  ({', '.join(group['reasons'])})")
+                for email in group["duplicates"]:
+                    print(f"  remover: {email}")
+            if len(report["groups"]) > self.SEARCH_LIMIT:
+                print(f"\nExibindo os primeiros {self.SEARCH_LIMIT} grupos.")
+            
+            confirm = input(f"\nMesclar e remover {report['duplicates']} lead(s)? (s/N): ").strip().lower()
+            if confirm == "s":
+                report = self.service.merge_duplicates(report)
+                print(f"{report['removed']} lead(s) removido(s).")
+            
+        except Exception as e:
+            print(f"Erro ao verificar duplicatas: {e}")
+    
+    def cohorts_interaction(self):
+        """Leads criados por semana e quantos qualificaram ou fecharam"""
+        try:
+            today = date.today()
+            default_start = today - timedelta(weeks=self.COHORT_WEEKS_DEFAULT)
+            start = input(f"\nData inicial (AAAA-MM-DD, padrão {default_start}): ").strip() or default_start
+            end = input(f"Data final (AAAA-MM-DD, padrão {today}): ").strip() or today
+            cohorts = self.service.weekly_cohorts(start, end)
+            
+            print("\nCOORTES SEMANAIS")
+            print("="*70)
+            print(f"{'Semana':<23} | {'Leads':>6} | {'Qualificados':>15} | {'Fechados':>15}")
+            print("-" * 70)
+            for cohort in cohorts:
+                print(f"{cohort['week']} a {cohort['week_end'][5:]:<10} | {cohort['total']:>6} | "
+                      f"{cohort['qualified']:>6} ({cohort['qualified_percent']:>5.1f}%) | "
+                      f"{cohort['closed']:>6} ({cohort['closed_percent']:>5.1f}%)")
+        
+        except ValueError as e:
+            print(f"Erro: {e}")
+        except Exception as e:
+            print(f"Erro nas coortes: {e}")
+    
     def export_csv_interaction(self):
         """Gerencia exportação para CSV"""
         try:
-            path = self.service.export_to_csv()
-            if path is None:
+            compress = input("Compactar com gzip? (s/N): ").strip().lower() == "s"
+            report = self.service.export_leads(compress=compress)
+            if report is None:
                 print("Nao foi possivel escrever o CSV. Verifique se o arquivo esta aberto.")
             else:
-                print(f"Exportado com sucesso para: {path}")
+                for path in report["files"]:
+                    print(f"Exportado com sucesso para: {path}")
+                print(f"{report['rows']} linha(s) em {report['seconds']:.2f}s "
+                      f"({report['rows_per_sec']:.0f} linhas/s)")
                 
         except Exception as e:
             print(f"Erro na exportacao: {e}")
     
+    def show_metrics(self):
+        """Exibe timers e contadores coletados (CRM_METRICS=1 ou --metrics)"""
+        if not metrics.enabled:
+            print("\nMétricas desligadas. Inicie com --metrics ou CRM_METRICS=1.")
+            return
+        print("\nMÉTRICAS DE DESEMPENHO")
+        print("="*82)
+        print(metrics.format_table())
+        cache = self.service.repository.cache_stats() \
+            if hasattr(self.service.repository, "cache_stats") else None
+        if cache:
+            print(f"\nCache: {cache['hits']} acerto(s), {cache['misses']} falha(s), "
+                  f"{cache['cached_leads']} lead(s) em memória")
+    
     def run(self):
         """Método principal que executa a aplicação"""
         self.running = True
@@ -189,6 +338,14 @@ class CRMApp:
                     self.promote_lead_interaction()
                 elif choice == "8":
                     self.export_csv_interaction()
+                elif choice == "9":
+                    self.show_metrics()
+                elif choice == "10":
+                    self.score_ranking_interaction()
+                elif choice == "11":
+                    self.duplicates_interaction()
+                elif choice == "12":
+                    self.cohorts_interaction()
                 elif choice == "0":
                     print("\nObrigado por usar o Mini CRM! Ate mais!")
                     self.running = False
@@ -203,8 +360,13 @@ class CRMApp:
 
 def main():
     """Função principal para compatibilidade"""
+    # --metrics: coleta métricas e imprime a tabela ao sair
+    if "--metrics" in sys.argv[1:]:
+        metrics.enable()
     app = CRMApp()
     app.run()
+    if "--metrics" in sys.argv[1:]:
+        app.show_metrics()
 
 # Funções de compatibilidade com código existente
 def add_flow():
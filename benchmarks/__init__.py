@@ -0,0 +1,12 @@
+# benchmarks/__init__.py
+# Scripts de medição de desempenho. Execute a partir da raiz do projeto:
+#   python -m benchmarks.run --sizes 10000 100000 1000000 --output results.json
+#   python -m benchmarks.compare antes.json depois.json
+#   python -m benchmarks.memory_models --size 100000
+#   python -m benchmarks.stress_writes --storage log --processes 8
+#   python -m benchmarks.parallel_scan --size 500000 --workers 1 2 4 8
+#   python -m benchmarks.snapshot_open --size 1000000
+#   python -m benchmarks.serialization --size 100000
+#   python -m benchmarks.dedupe_scale --size 1000000
+#   python -m benchmarks.http_load --size 50000 --clients 8
+#   python -m benchmarks.partitioned --size 200000
@@ -0,0 +1,40 @@
+# benchmarks/compare.py
+import argparse
+import json
+import sys
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {(r["storage"], r["size"], r["operation"]): r for r in data["results"]}, data["meta"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dois resultados de benchmarks.run")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--metric", default="p50_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"])
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="piora relativa tolerada antes de acusar regressão (0.10 = 10%%)")
+    args = parser.parse_args()
+    
+    baseline, baseline_meta = load(args.baseline)
+    candidate, candidate_meta = load(args.candidate)
+    print(f"{baseline_meta.get('revision')} -> {candidate_meta.get('revision')} ({args.metric})")
+    print(f"{'Motor':<7} | {'Tamanho':>8} | {'Operação':<16} | {'Antes':>10} | {'Depois':>10} | {'Variação':>9}")
+    
+    regressions = 0
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key][args.metric], candidate[key][args.metric]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSÃO"
+            regressions += 1
+        storage, size, operation = key
+        print(f"{storage:<7} | {size:>8} | {operation:<16} | {before:>10.3f} | {after:>10.3f} | "
+              f"{change:>+8.1%}{flag}")
+    
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
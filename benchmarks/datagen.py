@@ -0,0 +1,61 @@
+# benchmarks/datagen.py
+import json
+import random
+import unicodedata
+
+FIRST_NAMES = ["Ana", "João", "Maria", "José", "Conceição", "Luís", "Claus", "Beatriz", "Inês", "Estêvão"]
+LAST_NAMES = ["Silva", "Souza", "Araújo", "Gonçalves", "Moreira", "Lima", "Nóbrega", "Magalhães"]
+COMPANIES = ["CAA", "Açaí Ltda", "Padaria São João", "TechBR", "Construções Irmão", "Mercado Bom Preço"]
+DOMAINS = ["exemplo.com.br", "gmail.com", "comprealugueagora.com", "empresa.net"]
+STAGES = ["novo", "contatado", "proposta", "fechado"]
+
+SCORE_DISTRIBUTIONS = ("uniform", "normal", "skewed")
+
+def _score(rng, distribution):
+    if distribution == "normal":
+        value = rng.gauss(55, 20)
+    elif distribution == "skewed":
+        # Maioria com score baixo e cauda de high-value
+        value = rng.expovariate(1 / 25)
+    else:
+        value = rng.uniform(0, 100)
+    return max(0, min(100, int(value)))
+
+def _ascii(text):
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+def synthetic_records(count, qualified_ratio=0.3, score_distribution="uniform",
+                      non_ascii_ratio=0.2, seed=42):
+    """Gera registros determinísticos no formato de Lead.to_dict()
+    
+    Uma fração dos e-mails mantém acentos e caixa alta, como
+    'OLHAOLANÇA@GMAIL.COM' no leads.json de exemplo.
+    """
+    if score_distribution not in SCORE_DISTRIBUTIONS:
+        raise ValueError(f"Distribuição de score inválida: {score_distribution}")
+    rng = random.Random(seed)
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        local = f"{first}.{last}{i}"
+        if rng.random() < non_ascii_ratio:
+            local = local.upper()
+        else:
+            local = _ascii(local).lower()
+        data = {
+            "name": f"{first} {last}",
+            "company": rng.choice(COMPANIES),
+            "email": f"{local}@{rng.choice(DOMAINS)}",
+            "stage": rng.choice(STAGES),
+            "created": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        }
+        if rng.random() < qualified_ratio:
+            data["stage"] = "qualificado"
+            data["score"] = _score(rng, score_distribution)
+            data["type"] = "qualified"
+        yield data
+
+def write_dataset(path, count, **options):
+    """Grava um leads.json (array, formato original) com `count` leads sintéticos"""
+    records = list(synthetic_records(count, **options))
+    path.write_text(json.dumps(records, ensure_ascii=False, indent=2), encoding="utf-8")
+    return records
\ No newline at end of file
@@ -0,0 +1,97 @@
+# benchmarks/http_load.py
+import argparse
+import http.client
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote
+from benchmarks.datagen import write_dataset
+from benchmarks.run import summarize, SEARCH_QUERIES
+
+def client(port, requests, seed, latencies, statuses, revalidate):
+    """Thread cliente com conexão persistente (keep-alive)"""
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    etags = {}
+    for i in range(requests):
+        choice = rng.random()
+        if choice < 0.05:
+            method, path, body = "POST", "/leads", {
+                "name": f"Carga {seed}-{i}", "email": f"carga{seed}-{i}-{int(revalidate)}@load.test",
+                "company": "Carga"
+            }
+        elif choice < 0.35:
+            method, path, body = "GET", f"/search?q={quote(SEARCH_QUERIES[i % len(SEARCH_QUERIES)])}&limit=20", None
+        elif choice < 0.55:
+            method, path, body = "GET", "/stats", None
+        else:
+            method, path, body = "GET", "/leads?limit=20", None
+        
+        headers = {"Content-Type": "application/json"}
+        if revalidate and method == "GET" and path in etags:
+            headers["If-None-Match"] = etags[path]
+        started = time.perf_counter()
+        connection.request(method, path, json.dumps(body) if body else None, headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+        if response.getheader("ETag"):
+            etags[path] = response.getheader("ETag")
+    connection.close()
+
+def run(port, clients, requests, revalidate):
+    latencies, statuses = [], {}
+    threads = [
+        threading.Thread(target=client, args=(port, requests, seed, latencies, statuses, revalidate))
+        for seed in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+    result = summarize("revalidate" if revalidate else "full", latencies)
+    result.update(requests_per_sec=len(latencies) / seconds, statuses=statuses)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga no servidor HTTP (server.py)")
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--storage", choices=["json", "log"], default="log")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="requisições por cliente")
+    args = parser.parse_args()
+    
+    from repository import LeadRepository
+    from service import LeadService
+    from server import create_server
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "leads.json"
+        write_dataset(json_path, args.size)
+        repository = LeadRepository(json_path, storage=args.storage)
+        repository.list_all()
+        server = create_server(port=0, service=LeadService(repository))
+        port = server.server_address[1]
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            print(f"{args.storage} - {args.size} leads, {args.clients} clientes x {args.requests} requisições")
+            print(f"{'Modo':<11} | {'req/s':>9} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | Status")
+            for revalidate in (False, True):
+                result = run(port, args.clients, args.requests, revalidate)
+                print(f"{result['operation']:<11} | {result['requests_per_sec']:>9.1f} | "
+                      f"{result['p50_ms']:>8.3f} | {result['p95_ms']:>8.3f} | "
+                      f"{result['p99_ms']:>8.3f} | {result['statuses']}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,54 @@
+# benchmarks/parallel_scan.py
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from storage import LogStorage
+from parallel import ParallelScanner, parallel_search, parallel_stats, parallel_csv_rows
+from exporters import CSV_FIELDS, QUALIFIED_CSV_FIELDS
+from benchmarks.datagen import write_dataset
+
+def best_of(repeat, function):
+    """Menor tempo entre `repeat` execuções (reduz ruído do sistema)"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalabilidade da varredura paralela por número de processos")
+    parser.add_argument("--size", type=int, default=500000)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    fieldnames = CSV_FIELDS + QUALIFIED_CSV_FIELDS
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "leads.json"
+        write_dataset(json_path, args.size)
+        # O motor "log" migra o leads.json para o snapshot JSON Lines
+        storage = LogStorage(json_path)
+        size_mb = storage.snapshot_path.stat().st_size / 2**20
+        print(f"{args.size} leads, snapshot de {size_mb:.1f} MB, {os.cpu_count()} núcleo(s)")
+        print(f"{'Processos':>9} | {'search (s)':>10} | {'stats (s)':>9} | {'csv (s)':>8} | {'Ganho search':>12}")
+        print("-" * 62)
+        
+        baseline = None
+        for workers in args.workers:
+            # threshold=0: força o pool mesmo em arquivos pequenos; 1 processo = sem pool
+            scanner = ParallelScanner(workers, threshold=0)
+            # Primeira chamada sobe o pool; a subida fica fora da medição
+            parallel_stats(scanner, storage)
+            search = best_of(args.repeat, lambda: parallel_search(scanner, storage, "silva"))
+            stats = best_of(args.repeat, lambda: parallel_stats(scanner, storage))
+            export = best_of(args.repeat, lambda: sum(1 for _ in parallel_csv_rows(scanner, storage, fieldnames)))
+            scanner.close()
+            baseline = baseline or search
+            print(f"{workers:>9} | {search:>10.2f} | {stats:>9.2f} | {export:>8.2f} | {baseline / search:>11.2f}x")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+# benchmarks/partitioned.py
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from repository import LeadRepository
+from metrics import metrics
+from models import Lead
+from benchmarks.datagen import write_dataset
+
+def measure(function):
+    """(segundos, bytes lidos, bytes gravados) de uma chamada"""
+    metrics.reset()
+    started = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - started
+    return seconds, metrics.counters["storage.bytes_read"], metrics.counters["storage.bytes_written"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Motor partitioned vs json: adição, leitura por faixa e arquivamento")
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--adds", type=int, default=20)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "leads.json"
+        write_dataset(source, args.size)
+        metrics.enable()
+        print(f"{args.size} leads, sem cache (cada operação lê do disco)")
+        print(f"{'Motor':<12} | {'Operação':<22} | {'Tempo (ms)':>10} | {'Lido (KB)':>10} | {'Gravado (KB)':>12}")
+        print("-" * 78)
+        for storage in ("json", "partitioned"):
+            path = Path(tmp) / storage / "leads.json"
+            path.parent.mkdir()
+            path.write_bytes(source.read_bytes())
+            repository = LeadRepository(path, storage=storage, cache=False)
+            days = sorted(lead.created for lead in repository.list_all())
+            start = days[len(days) // 2]
+            end = days[min(len(days) - 1, len(days) // 2 + len(days) // 24)]
+            
+            cases = [
+                ("add", lambda: [
+                    repository.add(Lead(f"Bench {i}", f"bench{i}@partitioned.test", "Bench"))
+                    for i in range(args.adds)
+                ]),
+                ("leads_between (~2 sem)", lambda: repository.leads_between(start, end)),
+                ("list_page(fechado)", lambda: repository.list_page(None, 20, stage="fechado")),
+                ("list_all", repository.list_all)
+            ]
+            for name, function in cases:
+                seconds, read, written = measure(function)
+                if name == "add":
+                    seconds, read, written = seconds / args.adds, read / args.adds, written / args.adds
+                print(f"{storage:<12} | {name:<22} | {seconds * 1000:>10.2f} | "
+                      f"{read / 1024:>10.0f} | {written / 1024:>12.0f}")
+            
+            if storage == "partitioned":
+                before = sum(entry["bytes"] for entry in repository.storage.partitions())
+                months = [entry["name"] for entry in repository.storage.partitions()]
+                archived = repository.archive_partitions(months[len(months) // 2])
+                after = sum(entry["bytes"] for entry in repository.storage.partitions())
+                print(f"\nArquivadas {len(archived)} partições: {before / 2**20:.1f} MB -> {after / 2**20:.1f} MB")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
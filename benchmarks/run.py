@@ -0,0 +1,171 @@
+# benchmarks/run.py
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from benchmarks.datagen import write_dataset, SCORE_DISTRIBUTIONS
+
+STORAGES = ("json", "log", "sqlite")
+SEARCH_QUERIES = ["silva", "açaí", "joão.m", "claus", "gmail", "padaria são", "xyz-nada"]
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(operation, latencies):
+    """ops/s e percentis de latência (ms) de uma operação"""
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        "operation": operation,
+        "ops": len(ordered),
+        "ops_per_sec": len(ordered) / total if total > 0 else 0.0,
+        "mean_ms": total / len(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0
+    }
+
+def timed(function, arguments):
+    latencies = []
+    for args in arguments:
+        started = time.perf_counter()
+        function(*args)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+def open_service(storage, directory, json_path):
+    from service import LeadService
+    if storage == "sqlite":
+        from sqlite_repository import SQLiteLeadRepository
+        repository = SQLiteLeadRepository(directory / "leads.db")
+        repository.import_json(json_path)
+    else:
+        from repository import LeadRepository
+        # O motor "log" migra o leads.json na primeira abertura
+        repository = LeadRepository(json_path, storage=storage)
+    return LeadService(repository)
+
+def run_case(size, storage, options, ops, queue):
+    """Executa um cenário em processo separado (memória de pico isolada)"""
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        json_path = directory / "leads.json"
+        records = write_dataset(json_path, size, **options)
+        regular = [r["email"] for r in records if r.get("type") != "qualified"]
+        existing = [r["email"] for r in records]
+        del records
+        
+        results = []
+        started = time.perf_counter()
+        service = open_service(storage, directory, json_path)
+        service.list_all()
+        results.append(summarize("open_and_load", [time.perf_counter() - started]))
+        
+        results.append(summarize("get_by_email", timed(
+            service.repository.get_by_email,
+            [(rng.choice(existing),) for _ in range(ops)]
+        )))
+        results.append(summarize("search", timed(
+            service.search, [(SEARCH_QUERIES[i % len(SEARCH_QUERIES)],) for i in range(ops)]
+        )))
+        results.append(summarize("get_stats", timed(service.get_stats, [()] * ops)))
+        results.append(summarize("list_qualified", timed(
+            service.list_qualified, [()] * max(1, ops // 20)
+        )))
+        results.append(summarize("create_lead", timed(
+            service.create_lead,
+            [(f"Bench {i}", f"bench{i}@benchmark.test", "Bench") for i in range(ops)]
+        )))
+        results.append(summarize("promote_lead", timed(
+            service.promote_lead,
+            [(email, rng.randint(0, 100)) for email in rng.sample(regular, min(ops, len(regular)))]
+        )))
+        results.append(summarize("export_csv", timed(
+            service.repository.export_csv, [(directory / "export.csv",)]
+        )))
+        
+        for result in results:
+            result.update(size=size, storage=storage)
+        # ru_maxrss: KB no Linux
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        queue.put({"results": results, "peak_memory_mb": peak_mb})
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de LeadRepository/LeadService")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000],
+                        help="tamanhos dos datasets (ex.: 10000 100000 1000000)")
+    parser.add_argument("--storage", nargs="+", choices=STORAGES, default=list(STORAGES))
+    parser.add_argument("--ops", type=int, default=200, help="operações por medição")
+    parser.add_argument("--qualified-ratio", type=float, default=0.3)
+    parser.add_argument("--score-distribution", choices=SCORE_DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--non-ascii-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmarks/results.json")
+    args = parser.parse_args()
+    
+    options = {
+        "qualified_ratio": args.qualified_ratio,
+        "score_distribution": args.score_distribution,
+        "non_ascii_ratio": args.non_ascii_ratio,
+        "seed": args.seed
+    }
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "ops": args.ops,
+            "dataset": options
+        },
+        "results": [],
+        "peak_memory_mb": []
+    }
+    
+    for size in args.sizes:
+        for storage in args.storage:
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=run_case, args=(size, storage, options, args.ops, queue)
+            )
+            process.start()
+            case = queue.get()
+            process.join()
+            report["results"].extend(case["results"])
+            report["peak_memory_mb"].append(
+                {"size": size, "storage": storage, "peak_memory_mb": case["peak_memory_mb"]}
+            )
+            
+            print(f"\n{storage} - {size} leads (pico {case['peak_memory_mb']:.0f} MB)")
+            print(f"{'Operação':<16} | {'ops/s':>10} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}")
+            for result in case["results"]:
+                print(f"{result['operation']:<16} | {result['ops_per_sec']:>10.1f} | "
+                      f"{result['p50_ms']:>8.3f} | {result['p95_ms']:>8.3f} | {result['p99_ms']:>8.3f}")
+    
+    output = Path(args.output)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\nResultados gravados em {output}")
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
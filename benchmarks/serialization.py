@@ -0,0 +1,40 @@
+# benchmarks/serialization.py
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from storage import JsonFileStorage
+from serializers import SERIALIZERS
+from benchmarks.datagen import synthetic_records
+
+def best_of(repeat, function):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Tamanho, gravação e leitura de cada formato do motor json")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    records = list(synthetic_records(args.size))
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{args.size} leads")
+        print(f"{'Formato':<13} | {'Tamanho (MB)':>12} | {'Gravação (s)':>12} | {'Leitura (s)':>11} | {'vs json':>8}")
+        print("-" * 70)
+        baseline = None
+        for name in SERIALIZERS:
+            storage = JsonFileStorage(Path(tmp) / f"leads.{name}", serializer=name)
+            save = best_of(args.repeat, lambda: storage.save(records))
+            # Leitura com detecção automática, como no repositório
+            load = best_of(args.repeat, JsonFileStorage(storage.path).load)
+            size_mb = storage.path.stat().st_size / 2**20
+            baseline = baseline or load
+            print(f"{name:<13} | {size_mb:>12.1f} | {save:>12.3f} | {load:>11.3f} | {baseline / load:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,62 @@
+# benchmarks/snapshot_open.py
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from repository import LeadRepository
+from snapshot import SnapshotReader
+from benchmarks.datagen import write_dataset
+
+def main():
+    parser = argparse.ArgumentParser(description="Abertura e consultas: leads.json completo vs snapshot mmap")
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=10000)
+    args = parser.parse_args()
+    
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "leads.json"
+        emails = [record["email"] for record in write_dataset(json_path, args.size)]
+        sample = [rng.choice(emails) for _ in range(args.lookups)]
+        del emails
+        
+        started = time.perf_counter()
+        repository = LeadRepository(json_path)
+        repository.get_by_email(sample[0])
+        json_open = time.perf_counter() - started
+        started = time.perf_counter()
+        for email in sample:
+            repository.get_by_email(email)
+        json_lookups = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        snapshot_path = repository.write_snapshot()
+        write_seconds = time.perf_counter() - started
+        del repository
+        
+        started = time.perf_counter()
+        reader = SnapshotReader(snapshot_path)
+        snapshot_open = time.perf_counter() - started
+        started = time.perf_counter()
+        for email in sample:
+            reader.get_by_email(email)
+        snapshot_lookups = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(args.lookups):
+            reader[rng.randrange(len(reader))]
+        snapshot_positions = time.perf_counter() - started
+        reader.close()
+        
+        size_mb = snapshot_path.stat().st_size / 2**20
+        print(f"{args.size} leads; snapshot de {size_mb:.1f} MB gravado em {write_seconds:.2f}s")
+        print(f"{'Leitura':<28} | {'Abertura (s)':>12} | {'get_by_email (µs)':>17} | {'Posição (µs)':>12}")
+        print("-" * 80)
+        print(f"{'leads.json + cache/índice':<28} | {json_open:>12.3f} | "
+              f"{json_lookups / args.lookups * 1e6:>17.1f} | {'-':>12}")
+        print(f"{'snapshot mmap':<28} | {snapshot_open:>12.4f} | "
+              f"{snapshot_lookups / args.lookups * 1e6:>17.1f} | "
+              f"{snapshot_positions / args.lookups * 1e6:>12.1f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
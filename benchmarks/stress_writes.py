@@ -0,0 +1,145 @@
+# benchmarks/stress_writes.py
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from models import Lead
+from repository import LeadRepository
+from storage import LogStorage
+from service import LeadService
+
+def open_storage(db_path, storage, compact_every):
+    """Motor pelo nome; o "log" com compactação frequente, para exercitar leituras durante ela"""
+    if storage == "log" and compact_every:
+        return LogStorage(db_path, compact_every=compact_every)
+    return storage
+
+def worker(db_path, storage, worker_id, leads_per_thread, threads, window, shared,
+           compact_every, create, queue):
+    """Processo produtor: várias threads adicionando leads ao mesmo arquivo
+    
+    Além dos e-mails exclusivos, toda thread tenta criar os mesmos `shared`
+    e-mails pelo serviço (só uma criação de cada pode vencer), enquanto uma
+    thread leitora consulta count() e list_all() sem parar. Com `create`, os
+    e-mails exclusivos também passam por LeadService.create_lead.
+    """
+    repository = LeadRepository(db_path, storage=open_storage(db_path, storage, compact_every),
+                                group_commit_window=window)
+    service = LeadService(repository)
+    created = []
+    
+    def produce(thread_id):
+        for i in range(leads_per_thread):
+            email = f"p{worker_id}-t{thread_id}-{i}@stress.test"
+            if create:
+                service.create_lead(f"Lead {i}", email, "Stress")
+            else:
+                repository.add(Lead(f"Lead {i}", email, "Stress"))
+            if i < shared:
+                try:
+                    service.create_lead(f"Compartilhado {i}", f"shared-{i}@stress.test", "Stress")
+                    created.append(i)
+                except ValueError:
+                    pass
+    
+    done = threading.Event()
+    counts = []
+    listed = []
+    
+    def read_counts():
+        # Instâncias próprias: contadores lidos do arquivo de estatísticas e
+        # leads lidos dos dados (sem cache, cada leitura vai ao motor)
+        reader = LeadRepository(db_path, storage=open_storage(db_path, storage, compact_every))
+        lister = LeadRepository(db_path, storage=open_storage(db_path, storage, compact_every),
+                                cache=False)
+        while not done.is_set():
+            counts.append(reader.count())
+            listed.append(len(lister.list_all()))
+    
+    reader_thread = threading.Thread(target=read_counts)
+    reader_thread.start()
+    pool = [threading.Thread(target=produce, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    done.set()
+    reader_thread.join()
+    # Contagens vistas por um leitor nunca podem diminuir (só há adições)
+    regressions = sum(1 for before, after in zip(counts, counts[1:]) if after < before)
+    list_regressions = sum(1 for before, after in zip(listed, listed[1:]) if after < before)
+    queue.put({"created": created, "reads": len(counts), "count_regressions": regressions,
+               "list_regressions": list_regressions})
+
+def main():
+    parser = argparse.ArgumentParser(description="Estresse de gravações concorrentes: nenhum lead pode se perder")
+    parser.add_argument("--storage", choices=["json", "log"], default="log")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--leads", type=int, default=50, help="leads por thread")
+    parser.add_argument("--window", type=float, default=None,
+                        help="janela de group commit em segundos (padrão: desligado)")
+    parser.add_argument("--shared", type=int, default=10,
+                        help="e-mails disputados por todas as threads (cada um deve ser criado uma vez)")
+    parser.add_argument("--create", action="store_true",
+                        help="grava os e-mails exclusivos por LeadService.create_lead")
+    parser.add_argument("--compact-every", type=int, default=5,
+                        help="registros no log entre compactações do motor log (0 = padrão do motor)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "leads.json"
+        started = time.perf_counter()
+        queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=worker,
+                args=(db_path, args.storage, p, args.leads, args.threads, args.window,
+                      args.shared, args.compact_every, args.create, queue)
+            )
+            for p in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        reports = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+        seconds = time.perf_counter() - started
+        
+        expected = {
+            f"p{p}-t{t}-{i}@stress.test"
+            for p in range(args.processes) for t in range(args.threads) for i in range(args.leads)
+        }
+        shared = min(args.shared, args.leads)
+        expected |= {f"shared-{i}@stress.test" for i in range(shared)}
+        # Cada e-mail disputado deve ter exatamente uma criação bem-sucedida
+        wins = sorted(i for report in reports for i in report["created"])
+        double_creates = len(wins) - len(set(wins))
+        count_regressions = sum(report["count_regressions"] for report in reports)
+        list_regressions = sum(report["list_regressions"] for report in reports)
+        reads = sum(report["reads"] for report in reports)
+        repository = LeadRepository(db_path, storage=args.storage)
+        stored = [lead.email for lead in repository.list_all()]
+        missing = expected - set(stored)
+        duplicated = len(stored) - len(set(stored))
+        stats_ok = repository.verify_stats()["ok"]
+        
+        print(f"motor={args.storage} processos={args.processes} threads={args.threads} "
+              f"janela={args.window} create_lead={args.create}")
+        print(f"esperados={len(expected)} gravados={len(stored)} perdidos={len(missing)} "
+              f"duplicados={duplicated} estatisticas_ok={stats_ok}")
+        print(f"disputados={shared} criacoes_duplas={double_creates} "
+              f"leituras_count={reads} contagens_regredidas={count_regressions} "
+              f"listagens_regredidas={list_regressions}")
+        print(f"{len(expected) / seconds:.0f} leads/s ({seconds:.2f}s)")
+        
+        failed = (missing or duplicated or double_creates or count_regressions or list_regressions
+                  or not stats_ok
+                  or any(p.exitcode for p in processes))
+        sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,278 @@
+# cli.py
+import argparse
+import json
+import shlex
+import sys
+
+# Só a biblioteca padrão é importada aqui: --help e erros de uso não carregam
+# o repositório. Serviço e dados são abertos no primeiro comando executado.
+
+class CommandError(Exception):
+    """Erro de uso em uma linha de comando (argumentos inválidos)"""
+    pass
+
+class _CommandParser(argparse.ArgumentParser):
+    """Parser do modo batch: erro de uso vira exceção em vez de encerrar o processo"""
+    
+    def error(self, message):
+        raise CommandError(message)
+    
+    def exit(self, status=0, message=None):
+        raise CommandError(message.strip() if message else "comando encerrado")
+
+def _add_commands(subparsers):
+    """Subcomandos comuns à linha de comando e ao modo batch"""
+    add = subparsers.add_parser("add", help="adiciona um lead")
+    add.add_argument("name")
+    add.add_argument("email")
+    add.add_argument("--company", default="")
+    add.add_argument("--score", type=int, default=None,
+                     help="score 0-100; cria o lead já qualificado")
+    
+    import_parser = subparsers.add_parser("import", help="importa leads de CSV, JSON ou JSONL")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=["csv", "json", "jsonl"], default=None)
+    import_parser.add_argument("--batch-size", type=int, default=1000)
+    
+    search = subparsers.add_parser("search", help="busca leads por nome, empresa ou e-mail")
+    search.add_argument("query")
+    search.add_argument("--field", choices=["name", "company", "email"], default=None)
+    search.add_argument("--limit", type=int, default=None)
+    
+    subparsers.add_parser("stats", help="contagens de leads")
+    
+    promote = subparsers.add_parser("promote", help="promove um lead para qualificado")
+    promote.add_argument("email")
+    promote.add_argument("--score", type=int, default=0)
+    
+    export = subparsers.add_parser("export", help="exporta leads para CSV")
+    export.add_argument("--output", default=None)
+    export.add_argument("--compress", action="store_true")
+    export.add_argument("--rows-per-file", type=int, default=None)
+    
+    archive = subparsers.add_parser("archive", help="compacta partições antigas (motor partitioned)")
+    archive.add_argument("--before", required=True,
+                         help="mês AAAA-MM; partições anteriores são compactadas")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Mini CRM em linha de comando")
+    parser.add_argument("--db", help="arquivo de dados (padrão: data/leads.json)")
+    parser.add_argument("--storage", choices=["json", "log", "partitioned", "sqlite"],
+                        default="json")
+    parser.add_argument("--json", action="store_true", dest="as_json",
+                        help="saída em JSON, um objeto por comando")
+    parser.add_argument("--metrics", action="store_true", help="imprime métricas ao sair")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _add_commands(subparsers)
+    
+    batch = subparsers.add_parser(
+        "batch", help="executa um arquivo de comandos (um por linha; - lê da entrada padrão)"
+    )
+    batch.add_argument("file")
+    batch.add_argument("--stop-on-error", action="store_true",
+                       help="para no primeiro erro (adds consecutivos são gravados juntos)")
+    return parser
+
+def build_command_parser():
+    """Parser de uma linha do arquivo batch (sem opções globais)"""
+    parser = _CommandParser(prog="batch", add_help=False)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _add_commands(subparsers)
+    return parser
+
+def open_service(db_path=None, storage="json"):
+    from service import LeadService
+    if storage == "sqlite":
+        from sqlite_repository import SQLiteLeadRepository
+        return LeadService(SQLiteLeadRepository(db_path))
+    if db_path is None and storage == "json":
+        from service import lead_service
+        return lead_service
+    from repository import LeadRepository
+    return LeadService(LeadRepository(db_path, storage=storage))
+
+# ---- Comandos (retornam um resultado serializável em JSON) ----------------
+
+def add_row(args):
+    """Linha no formato do importador equivalente a um comando add"""
+    row = {"name": args.name, "email": args.email, "company": args.company}
+    if args.score is not None:
+        row.update(type="qualified", score=max(0, min(100, args.score)))
+    return row
+
+def run_add(service, args):
+    if args.score is None:
+        lead = service.create_lead(args.name, args.email, args.company)
+    else:
+        lead = service.create_lead(
+            args.name, args.email, args.company, qualify=True, score=max(0, min(100, args.score))
+        )
+    return lead.to_dict()
+
+def run_import(service, args):
+    return service.import_leads(args.path, format=args.format, batch_size=args.batch_size)
+
+def run_search(service, args):
+    return [lead.to_dict() for lead in service.search(args.query, field=args.field, limit=args.limit)]
+
+def run_stats(service, args):
+    return service.get_stats()
+
+def run_promote(service, args):
+    return service.promote_lead(args.email, max(0, min(100, args.score))).to_dict()
+
+def run_archive(service, args):
+    return {"archived": service.archive_partitions(args.before)}
+
+def run_export(service, args):
+    report = service.export_leads(
+        args.output, compress=args.compress, rows_per_file=args.rows_per_file
+    )
+    if report is None:
+        raise ValueError("Não foi possível escrever o CSV")
+    report["files"] = [str(path) for path in report["files"]]
+    return report
+
+COMMANDS = {
+    "add": run_add,
+    "import": run_import,
+    "search": run_search,
+    "stats": run_stats,
+    "promote": run_promote,
+    "export": run_export,
+    "archive": run_archive
+}
+
+def format_result(command, result):
+    """Texto legível do resultado de um comando"""
+    if command in ("add", "promote"):
+        kind = "qualificado" if result.get("type") == "qualified" else "regular"
+        verb = "adicionado" if command == "add" else "promovido"
+        return f"Lead {verb}: {result['name']} <{result['email']}> ({kind})"
+    if command == "import":
+        lines = [f"Importados: {result['accepted']} | Rejeitados: {result['rejected']}"]
+        lines += [f"  linha {error['line']}: {error['error']}" for error in result["errors"]]
+        return "\n".join(lines)
+    if command == "search":
+        lines = [f"{lead['name']} | {lead.get('company', '')} | {lead['email']}" for lead in result]
+        lines.append(f"Encontrados: {len(result)} lead(s)")
+        return "\n".join(lines)
+    if command == "stats":
+        return "\n".join(f"{key}: {value}" for key, value in result.items())
+    if command == "export":
+        return f"{result['rows']} leads exportados para {', '.join(result['files'])}"
+    if command == "archive":
+        if not result["archived"]:
+            return "Nenhuma partição para arquivar"
+        return f"Partições arquivadas: {', '.join(result['archived'])}"
+    return str(result)
+
+class Output:
+    """Escreve resultados e erros em texto ou em JSON (um objeto por linha)"""
+    
+    def __init__(self, as_json, stream=None):
+        self.as_json = as_json
+        self.stream = stream or sys.stdout
+    
+    def result(self, command, result, line=None):
+        if self.as_json:
+            payload = {"ok": True, "command": command, "result": result}
+            if line is not None:
+                payload["line"] = line
+            print(json.dumps(payload, ensure_ascii=False), file=self.stream)
+        else:
+            prefix = f"[{line}] " if line is not None else ""
+            print(prefix + format_result(command, result), file=self.stream)
+    
+    def error(self, command, message, line=None):
+        if self.as_json:
+            payload = {"ok": False, "command": command, "error": message}
+            if line is not None:
+                payload["line"] = line
+            print(json.dumps(payload, ensure_ascii=False), file=self.stream)
+        else:
+            prefix = f"[{line}] " if line is not None else ""
+            print(f"{prefix}Erro: {message}", file=sys.stderr)
+
+# ---- Modo batch ------------------------------------------------------------
+
+def run_batch(service, lines, output, stop_on_error=False):
+    """Executa os comandos das linhas em um único processo; retorna a quantidade de erros
+    
+    Linhas vazias e iniciadas por # são ignoradas. Comandos add consecutivos
+    são validados e gravados juntos pelo importador (uma gravação por sequência
+    em vez de uma por lead), antes do próximo comando de outro tipo.
+    """
+    parser = build_command_parser()
+    failures = 0
+    pending = []
+    
+    def flush():
+        nonlocal failures
+        if not pending:
+            return
+        report = service.import_leads([add_row(args) for _, args in pending], batch_size=len(pending))
+        errors = {error["line"]: error["error"] for error in report["errors"]}
+        for index, (number, args) in enumerate(pending, start=1):
+            if index in errors:
+                failures += 1
+                output.error("add", errors[index], number)
+            else:
+                output.result("add", add_row(args), number)
+        pending.clear()
+    
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            args = parser.parse_args(shlex.split(line))
+        except (CommandError, ValueError) as e:
+            flush()
+            failures += 1
+            output.error(line.split()[0], str(e), number)
+        else:
+            if args.command == "add":
+                pending.append((number, args))
+                continue
+            flush()
+            try:
+                output.result(args.command, COMMANDS[args.command](service, args), number)
+            except (ValueError, OSError) as e:
+                failures += 1
+                output.error(args.command, str(e), number)
+        if failures and stop_on_error:
+            break
+    
+    flush()
+    return failures
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.metrics:
+        from metrics import metrics
+        metrics.enable()
+    
+    output = Output(args.as_json)
+    service = open_service(args.db, args.storage)
+    if args.command == "batch":
+        if args.file == "-":
+            failures = run_batch(service, sys.stdin, output, args.stop_on_error)
+        else:
+            with open(args.file, encoding="utf-8") as f:
+                failures = run_batch(service, f, output, args.stop_on_error)
+    else:
+        failures = 0
+        try:
+            output.result(args.command, COMMANDS[args.command](service, args))
+        except (ValueError, OSError) as e:
+            failures = 1
+            output.error(args.command, str(e))
+    
+    if args.metrics:
+        from metrics import metrics
+        print(metrics.format_table(), file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,136 @@
+# dedupe.py
+import re
+import time
+import unicodedata
+from models import QualifiedLead, normalize_email
+from metrics import instrumented, metrics
+
+# Blocos maiores que isto são genéricos demais (ex.: nome comum em uma
+# empresa grande) e não indicam duplicata; ficam de fora do relatório
+MAX_BLOCK_SIZE = 50
+
+# Em provedores gratuitos, domínio + nome não identifica a mesma pessoa
+FREE_MAIL_DOMAINS = frozenset({
+    "gmail.com", "hotmail.com", "outlook.com", "live.com", "yahoo.com",
+    "yahoo.com.br", "icloud.com", "uol.com.br", "bol.com.br", "terra.com.br"
+})
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+def normalize_text(text):
+    """Sem acentos, caixa ou pontuação: 'Padaria São-João ' -> 'padaria sao joao'"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(" ", text.casefold()).strip()
+
+def email_key(email):
+    """E-mail normalizado sem o sufixo +tag da parte local (joao+crm@x -> joao@x)"""
+    key = normalize_email(email)
+    local, _, domain = key.rpartition("@")
+    return f"{local.split('+', 1)[0]}@{domain}"
+
+def blocking_keys(lead):
+    """Chaves de bloco do lead: leads que compartilham uma chave são prováveis duplicatas"""
+    key = email_key(lead.email)
+    yield "email", key
+    name = normalize_text(lead.name)
+    if not name:
+        return
+    domain = key.rpartition("@")[2]
+    if domain and domain not in FREE_MAIL_DOMAINS:
+        yield "domain_name", f"{domain}\x1f{name}"
+    company = normalize_text(lead.company)
+    if company:
+        yield "company_name", f"{company}\x1f{name}"
+
+def choose_survivor(leads):
+    """O QualifiedLead de maior score; sem qualificados, o mais antigo (primeiro da lista)"""
+    return max(
+        enumerate(leads),
+        key=lambda item: (isinstance(item[1], QualifiedLead), getattr(item[1], "score", 0), -item[0])
+    )[1]
+
+class _DisjointSet:
+    def __init__(self, size):
+        self.parent = list(range(size))
+    
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+    
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # A menor posição vira raiz: grupos saem na ordem do arquivo
+            if root_b < root_a:
+                root_a, root_b = root_b, root_a
+            self.parent[root_b] = root_a
+
+@instrumented("dedupe.find_duplicates")
+def find_duplicates(leads, max_block_size=MAX_BLOCK_SIZE):
+    """Agrupa prováveis duplicatas por chaves de bloco, sem comparar todos os pares
+    
+    Uma passada: cada chave guarda a primeira posição em que apareceu; só
+    chaves repetidas ganham lista de membros. Blocos ligados por qualquer
+    chave são unidos (union-find) em um grupo. Custo O(n) em tempo e memória.
+    Retorna relatório com os grupos, o lead mantido em cada um e os motivos.
+    """
+    started = time.perf_counter()
+    leads = list(leads)
+    first = {}
+    blocks = {}
+    for position, lead in enumerate(leads):
+        for kind, key in blocking_keys(lead):
+            block_id = (kind, key)
+            other = first.setdefault(block_id, position)
+            if other == position:
+                continue
+            members = blocks.get(block_id)
+            if members is None:
+                blocks[block_id] = [other, position]
+            elif len(members) <= max_block_size:
+                members.append(position)
+    
+    groups = _DisjointSet(len(leads))
+    reasons = {}
+    skipped = 0
+    for (kind, _), members in blocks.items():
+        if len(members) > max_block_size:
+            skipped += 1
+            continue
+        for position in members[1:]:
+            groups.union(members[0], position)
+        reasons.setdefault(members[0], set()).add(kind)
+    
+    members_by_root = {}
+    for members in blocks.values():
+        if len(members) > max_block_size:
+            continue
+        for position in members:
+            members_by_root.setdefault(groups.find(position), set()).add(position)
+    reasons_by_root = {}
+    for position, kinds in reasons.items():
+        reasons_by_root.setdefault(groups.find(position), set()).update(kinds)
+    
+    report_groups = []
+    for root in sorted(members_by_root):
+        group = [leads[position] for position in sorted(members_by_root[root])]
+        survivor = choose_survivor(group)
+        report_groups.append({
+            "survivor": survivor.email,
+            "duplicates": [lead.email for lead in group if lead is not survivor],
+            "reasons": sorted(reasons_by_root[root])
+        })
+    
+    duplicates = sum(len(group["duplicates"]) for group in report_groups)
+    metrics.incr("dedupe.duplicates_found", duplicates)
+    return {
+        "leads": len(leads),
+        "groups": report_groups,
+        "duplicates": duplicates,
+        "skipped_blocks": skipped,
+        "seconds": time.perf_counter() - started
+    }
\ No newline at end of file
@@ -0,0 +1,123 @@
+# exporters.py
+from pathlib import Path
+import csv
+import gzip
+import re
+import time
+
+# Colunas do CSV compatíveis com estrutura existente
+CSV_FIELDS = ["name", "company", "email", "stage", "created"]
+QUALIFIED_CSV_FIELDS = ["score", "type"]
+
+class CsvExporter:
+    """Exportação CSV em streaming: escreve cada registro assim que é lido
+    
+    Suporta compressão gzip e divisão em vários arquivos, por quantidade de
+    linhas (rows_per_file) e/ou por valor de um campo (partition_by="stage").
+    """
+    
+    def __init__(self, path, include_qualified=True, compress=False,
+                 rows_per_file=None, partition_by=None):
+        self.path = Path(path)
+        self.fieldnames = list(CSV_FIELDS)
+        # O chamador informa se há qualificados (flag pré-calculada), evitando
+        # uma passada extra só para decidir o cabeçalho
+        if include_qualified:
+            self.fieldnames.extend(QUALIFIED_CSV_FIELDS)
+        if partition_by is not None and partition_by not in self.fieldnames:
+            raise ValueError(f"Campo de partição inválido: {partition_by}")
+        if rows_per_file is not None and rows_per_file < 1:
+            raise ValueError("rows_per_file deve ser positivo")
+        self.compress = compress
+        self.rows_per_file = rows_per_file
+        self.partition_by = partition_by
+        self._outputs = {}
+        self.files = []
+    
+    def write(self, records):
+        """Consome um iterável de dicionários e retorna relatório de vazão"""
+        started = time.perf_counter()
+        rows = 0
+        try:
+            if self.rows_per_file is None and self.partition_by is None:
+                # Arquivo único: cabeçalho sai mesmo sem registros
+                self._open(None)
+            for record in records:
+                self._writer_for(record).writerow(record)
+                rows += 1
+        finally:
+            self._close_all()
+        return self._report(rows, started)
+    
+    def write_rendered(self, rows):
+        """Como write(), para linhas de CSV já formatadas (ex.: varredura paralela)
+        
+        Só para arquivo único, sem rows_per_file nem partition_by.
+        """
+        if self.rows_per_file is not None or self.partition_by is not None:
+            raise ValueError("Linhas formatadas só podem ir para um arquivo único")
+        started = time.perf_counter()
+        count = 0
+        try:
+            f = self._open(None)["file"]
+            for row in rows:
+                f.write(row)
+                count += 1
+        finally:
+            self._close_all()
+        return self._report(count, started)
+    
+    def _close_all(self):
+        for output in self._outputs.values():
+            output["file"].close()
+        self._outputs = {}
+    
+    def _report(self, rows, started):
+        seconds = time.perf_counter() - started
+        return {
+            "files": self.files,
+            "rows": rows,
+            "seconds": seconds,
+            "rows_per_sec": rows / seconds if seconds > 0 else float(rows),
+            "bytes": sum(path.stat().st_size for path in self.files)
+        }
+    
+    def _writer_for(self, record):
+        partition = None
+        if self.partition_by is not None:
+            partition = str(record.get(self.partition_by) or "vazio")
+        output = self._outputs.get(partition)
+        if output is None or (self.rows_per_file and output["rows"] >= self.rows_per_file):
+            output = self._open(partition)
+        output["rows"] += 1
+        return output["writer"]
+    
+    def _open(self, partition):
+        previous = self._outputs.get(partition)
+        if previous is not None:
+            previous["file"].close()
+        part = previous["part"] + 1 if previous else 1
+        
+        path = self._file_path(partition, part)
+        if self.compress:
+            f = gzip.open(path, "wt", newline="", encoding="utf-8")
+        else:
+            f = path.open("w", newline="", encoding="utf-8")
+        # Campos fora do layout do CSV (ex.: stage_changed) ficam de fora
+        writer = csv.DictWriter(f, fieldnames=self.fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        
+        self.files.append(path)
+        self._outputs[partition] = {"file": f, "writer": writer, "rows": 0, "part": part}
+        return self._outputs[partition]
+    
+    def _file_path(self, partition, part):
+        """leads.csv -> leads-novo-0002.csv(.gz) conforme partição/parte"""
+        stem, suffix = self.path.stem, self.path.suffix or ".csv"
+        if partition is not None:
+            stem += "-" + re.sub(r"[^\w.-]+", "_", partition)
+        if self.rows_per_file is not None:
+            stem += f"-{part:04d}"
+        if self.compress:
+            suffix += ".gz"
+        return self.path.with_name(stem + suffix)
\ No newline at end of file
@@ -0,0 +1,101 @@
+# importers.py
+from pathlib import Path
+import csv
+import json
+
+IMPORT_FORMATS = ("csv", "json", "jsonl")
+
+def detect_format(path):
+    """Deduz o formato pela extensão do arquivo (.csv, .json, .jsonl/.ndjson)"""
+    suffix = Path(path).suffix.lower()
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if suffix in (".csv", ".json"):
+        return suffix[1:]
+    raise ValueError(f"Formato de importação não reconhecido: {path}")
+
+def iter_csv_rows(stream):
+    """Linhas no layout do export_csv (name, company, email, stage, created[, score, type])"""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        # line_num aponta para a última linha física lida (conta o cabeçalho)
+        yield reader.line_num, row
+
+def iter_jsonl_rows(stream):
+    """Um objeto JSON por linha; linhas em branco são ignoradas"""
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except json.JSONDecodeError:
+            # Linha inválida não interrompe a importação: vira rejeição
+            yield number, None
+
+def iter_json_array_rows(stream, chunk_size=65536):
+    """Percorre um array JSON objeto a objeto, sem carregar o arquivo inteiro"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    number = 0
+    eof = False
+    
+    while True:
+        # Descarta separadores entre elementos
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if not started and position < len(buffer):
+            if buffer[position] != "[":
+                raise ValueError("JSON de importação deve ser um array de objetos")
+            started = True
+            position += 1
+            continue
+        if started and position < len(buffer) and buffer[position] == "]":
+            return
+        
+        try:
+            if position >= len(buffer):
+                raise json.JSONDecodeError("fim do buffer", buffer, position)
+            data, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                if not started and not buffer.strip():
+                    return
+                raise ValueError("JSON de importação incompleto ou inválido")
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        
+        number += 1
+        yield number, data
+        position = end
+
+ROW_READERS = {
+    "csv": iter_csv_rows,
+    "json": iter_json_array_rows,
+    "jsonl": iter_jsonl_rows,
+}
+
+def read_rows(source, format=None):
+    """Gera (número, dicionário) a partir de caminho, arquivo aberto ou iterável de dicts
+    
+    Arquivos são lidos de forma incremental; nada é materializado por completo.
+    """
+    if isinstance(source, (str, Path)):
+        format = format or detect_format(source)
+        with open(source, "r", newline="", encoding="utf-8-sig") as stream:
+            yield from read_rows(stream, format)
+        return
+    
+    if hasattr(source, "read"):
+        if format not in ROW_READERS:
+            raise ValueError(f"Informe o formato ({', '.join(IMPORT_FORMATS)}) para arquivos abertos")
+        yield from ROW_READERS[format](source)
+        return
+    
+    # Iterável de dicionários já carregados
+    for number, row in enumerate(source, start=1):
+        yield number, row
\ No newline at end of file
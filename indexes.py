@@ -0,0 +1,186 @@
+# indexes.py
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from models import QualifiedLead, normalize_email
+
+class EmailIndex:
+    """Índice hash: e-mail normalizado -> posição do lead na lista em cache"""
+    
+    def __init__(self, leads=()):
+        self._positions = {}
+        for position, lead in enumerate(leads):
+            self.add(lead.email, position)
+    
+    def add(self, email, position):
+        """Registra a posição; em duplicatas antigas vale a primeira ocorrência"""
+        self._positions.setdefault(normalize_email(email), position)
+    
+    def get(self, email):
+        """Retorna a posição do lead com o e-mail ou None"""
+        return self._positions.get(normalize_email(email))
+    
+    def __contains__(self, email):
+        return normalize_email(email) in self._positions
+    
+    def __len__(self):
+        return len(self._positions)
+
+SEARCH_FIELDS = ("name", "company", "email")
+
+def search_text(lead, field=None):
+    """Texto pesquisável do lead (mesma composição usada pela busca original)"""
+    if field is None:
+        return f"{lead.name} {lead.company} {lead.email}".lower()
+    return getattr(lead, field).lower()
+
+def trigrams(text):
+    """Conjunto de trigramas (substrings de 3 caracteres) de um texto"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class TrigramIndex:
+    """Índice invertido trigrama -> posições (array ordenado) sobre nome, empresa e e-mail
+    
+    Indexa o mesmo texto combinado que a busca verifica; como os campos são
+    substrings desse texto, o índice também serve para buscas por campo.
+    """
+    
+    def __init__(self, leads=()):
+        self._postings = {}
+        for position, lead in enumerate(leads):
+            self.add(lead, position)
+    
+    def add(self, lead, position):
+        for gram in trigrams(search_text(lead)):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("I")
+            if not postings or postings[-1] < position:
+                postings.append(position)
+            else:
+                insort(postings, position)
+    
+    def remove(self, lead, position):
+        for gram in trigrams(search_text(lead)):
+            postings = self._postings.get(gram)
+            if postings is None:
+                continue
+            i = bisect_left(postings, position)
+            if i < len(postings) and postings[i] == position:
+                del postings[i]
+    
+    def replace(self, old_lead, new_lead, position):
+        """Atualiza a posição só se o texto pesquisável mudou"""
+        if search_text(old_lead) != search_text(new_lead):
+            self.remove(old_lead, position)
+            self.add(new_lead, position)
+    
+    def candidates(self, query):
+        """Posições candidatas (ordenadas) para a consulta já em minúsculas
+        
+        Retorna None para consultas curtas demais para usar trigramas.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return None
+        empty = array("I")
+        # A lista do trigrama mais raro já limita os candidatos; o
+        # chamador confirma cada um com a comparação de substring
+        return min((self._postings.get(gram, empty) for gram in grams), key=len)
+
+class ScoreIndex:
+    """Índice ordenado de leads qualificados por score (maior primeiro)
+    
+    Guarda chaves (-score, posição) em uma lista ordenada: top-K lê as
+    primeiras K chaves e faixas de score são localizadas com bisect, em
+    O(log n + k). Empates mantêm a ordem de cadastro.
+    """
+    
+    def __init__(self, leads=()):
+        self._keys = sorted(
+            (-lead.score, position) for position, lead in enumerate(leads)
+            if isinstance(lead, QualifiedLead)
+        )
+    
+    def add(self, lead, position):
+        if isinstance(lead, QualifiedLead):
+            insort(self._keys, (-lead.score, position))
+    
+    def remove(self, lead, position):
+        if not isinstance(lead, QualifiedLead):
+            return
+        key = (-lead.score, position)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+    
+    def replace(self, old_lead, new_lead, position):
+        self.remove(old_lead, position)
+        self.add(new_lead, position)
+    
+    def top(self, k):
+        """Posições dos k maiores scores"""
+        return [position for _, position in self._keys[:k]]
+    
+    def between(self, low, high):
+        """Posições com low <= score <= high, do maior para o menor score"""
+        start = bisect_left(self._keys, (-high, -1))
+        end = bisect_right(self._keys, (-low, float("inf")))
+        return [position for _, position in self._keys[start:end]]
+    
+    def __len__(self):
+        return len(self._keys)
+
+def created_day(lead):
+    """Dia de criação (AAAA-MM-DD) do lead; vazio se não informado"""
+    return (lead.created or "")[:10]
+
+class DateIndex:
+    """Índice por dia de criação: dia -> posições (ordem de cadastro)
+    
+    Os dias ficam em uma lista ordenada; uma faixa de datas é localizada com
+    bisect e percorre só os baldes dos dias dentro dela, em O(log d + k).
+    """
+    
+    def __init__(self, leads=()):
+        self._days = []
+        self._buckets = {}
+        for position, lead in enumerate(leads):
+            self.add(lead, position)
+    
+    def add(self, lead, position):
+        day = created_day(lead)
+        bucket = self._buckets.get(day)
+        if bucket is None:
+            bucket = self._buckets[day] = array("I")
+            insort(self._days, day)
+        if not bucket or bucket[-1] < position:
+            bucket.append(position)
+        else:
+            insort(bucket, position)
+    
+    def remove(self, lead, position):
+        day = created_day(lead)
+        bucket = self._buckets.get(day)
+        if bucket is None:
+            return
+        i = bisect_left(bucket, position)
+        if i < len(bucket) and bucket[i] == position:
+            del bucket[i]
+        if not bucket:
+            del self._buckets[day]
+            del self._days[bisect_left(self._days, day)]
+    
+    def replace(self, old_lead, new_lead, position):
+        """Atualiza a posição só se o dia de criação mudou"""
+        if created_day(old_lead) != created_day(new_lead):
+            self.remove(old_lead, position)
+            self.add(new_lead, position)
+    
+    def between(self, start, end):
+        """Posições com start <= dia <= end (datas ISO), por dia e ordem de cadastro"""
+        first = bisect_left(self._days, start)
+        last = bisect_right(self._days, end)
+        return [position for day in self._days[first:last] for position in self._buckets[day]]
+    
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets.values())
\ No newline at end of file
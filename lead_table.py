@@ -0,0 +1,131 @@
+# lead_table.py
+from array import array
+from datetime import date
+import sys
+from models import Lead, QualifiedLead
+
+# Valor de score usado para leads regulares na coluna de scores
+NO_SCORE = -1
+
+class LeadTable:
+    """Representação colunar e compacta de leads para leituras em massa
+    
+    Cada campo fica em uma coluna: nomes e e-mails em listas, empresas
+    internadas, estágio como código em array, score em array de bytes e
+    data de criação como ordinal inteiro. Objetos Lead/QualifiedLead só são
+    criados quando uma posição é acessada.
+    """
+    
+    def __init__(self):
+        self.names = []
+        self.emails = []
+        self.companies = []
+        self.stages = array("B")
+        self.scores = array("b")
+        self.created = array("I")
+        self._stage_values = []
+        self._stage_codes = {}
+        # Datas fora do formato AAAA-MM-DD são preservadas como texto
+        self._raw_created = {}
+        self._ordinals = {}
+        # Poucos leads têm mudança de estágio registrada: coluna esparsa
+        self._stage_changed = {}
+    
+    @classmethod
+    def from_records(cls, records):
+        """Cria a tabela a partir de dicionários no formato de to_dict()"""
+        table = cls()
+        for data in records:
+            table.append(data)
+        return table
+    
+    @classmethod
+    def from_leads(cls, leads):
+        """Cria a tabela a partir de objetos Lead/QualifiedLead"""
+        return cls.from_records(lead.to_dict() for lead in leads)
+    
+    def append(self, data):
+        position = len(self.names)
+        self.names.append(data["name"])
+        self.emails.append(data["email"])
+        self.companies.append(sys.intern(data.get("company") or ""))
+        self.stages.append(self._stage_code(data.get("stage", "novo")))
+        
+        if data.get("type") == "qualified":
+            self.scores.append(self._score(data.get("score", 0)))
+        else:
+            self.scores.append(NO_SCORE)
+        
+        created = data.get("created")
+        ordinal = self._ordinal(created) if created else 0
+        if created and not ordinal:
+            self._raw_created[position] = created
+        self.created.append(ordinal)
+        
+        if data.get("stage_changed"):
+            self._stage_changed[position] = data["stage_changed"]
+    
+    def _score(self, score):
+        """Score inteiro de 0-100 para a coluna (arquivos podem trazer 52.5 ou "52")"""
+        try:
+            score = int(float(score))
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Score inválido: {score}")
+        return max(0, min(100, score))
+    
+    def _ordinal(self, created):
+        """Converte 'AAAA-MM-DD' em ordinal (0 se não for uma data canônica)"""
+        ordinal = self._ordinals.get(created)
+        if ordinal is None:
+            try:
+                ordinal = date.fromisoformat(created).toordinal()
+                if date.fromordinal(ordinal).isoformat() != created:
+                    ordinal = 0
+            except (TypeError, ValueError):
+                ordinal = 0
+            self._ordinals[created] = ordinal
+        return ordinal
+    
+    def _stage_code(self, stage):
+        code = self._stage_codes.get(stage)
+        if code is None:
+            code = len(self._stage_values)
+            self._stage_values.append(sys.intern(stage))
+            self._stage_codes[stage] = code
+        return code
+    
+    def stage_at(self, position):
+        return self._stage_values[self.stages[position]]
+    
+    def created_at(self, position):
+        ordinal = self.created[position]
+        if ordinal:
+            return date.fromordinal(ordinal).isoformat()
+        return self._raw_created.get(position)
+    
+    def is_qualified(self, position):
+        return self.scores[position] != NO_SCORE
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def __getitem__(self, position):
+        """Materializa o lead da posição sob demanda"""
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if self.is_qualified(position):
+            return QualifiedLead(
+                self.names[position], self.emails[position], self.companies[position],
+                self.scores[position], self.created_at(position), self.stage_at(position),
+                self._stage_changed.get(position)
+            )
+        return Lead(
+            self.names[position], self.emails[position], self.companies[position],
+            self.stage_at(position), self.created_at(position), self._stage_changed.get(position)
+        )
+    
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
\ No newline at end of file
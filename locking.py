@@ -0,0 +1,159 @@
+# locking.py
+from pathlib import Path
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem flock, vale apenas o lock entre threads
+    fcntl = None
+
+class FileLock:
+    """Lock consultivo exclusivo entre processos (fcntl.flock) e threads
+    
+    Reentrante na mesma thread: operações do repositório podem se aninhar
+    (ex.: update chamando _write) sem travar.
+    """
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+    
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._file = self.path.open("a+b")
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            except BaseException:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+    
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+class GroupCommit:
+    """Agrupa gravações de várias threads que chegam dentro de uma janela curta
+    
+    A primeira thread a chegar vira líder: espera `window` segundos, junta
+    tudo o que foi enfileirado nesse intervalo e chama `flush` uma única vez.
+    As demais apenas aguardam o resultado. `flush` retorna um resultado por
+    item, e cada thread recebe os resultados dos itens que enviou.
+    """
+    
+    def __init__(self, flush, window=0.005):
+        self.flush = flush
+        self.window = window
+        self._lock = threading.Lock()
+        self._pending = []
+        self._leader_active = False
+        self.commits = 0
+        self.items = 0
+    
+    def submit(self, items):
+        entry = {"items": items, "done": threading.Event(), "error": None, "results": None}
+        with self._lock:
+            self._pending.append(entry)
+            is_leader = not self._leader_active
+            self._leader_active = True
+        
+        if is_leader:
+            time.sleep(self.window)
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._leader_active = False
+            try:
+                results = self.flush([item for queued in batch for item in queued["items"]])
+                start = 0
+                for queued in batch:
+                    end = start + len(queued["items"])
+                    queued["results"] = results[start:end]
+                    start = end
+                self.commits += 1
+                self.items += sum(len(queued["items"]) for queued in batch)
+            except Exception as e:
+                for queued in batch:
+                    queued["error"] = e
+            for queued in batch:
+                queued["done"].set()
+        
+        entry["done"].wait()
+        if entry["error"] is not None:
+            raise entry["error"]
+        return entry["results"]
+
+class ReadWriteLock:
+    """Vários leitores simultâneos ou um único escritor (entre threads)
+    
+    Escritores têm preferência: um escritor esperando bloqueia novos
+    leitores, para que leituras contínuas não adiem gravações para sempre.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+    
+    def acquire_read(self):
+        with self._condition:
+            while self._writer or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+    
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+    
+    def acquire_write(self):
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+    
+    def release_write(self):
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+    
+    def reading(self):
+        return _Held(self.acquire_read, self.release_read)
+    
+    def writing(self):
+        return _Held(self.acquire_write, self.release_write)
+
+class _Held:
+    def __init__(self, acquire, release):
+        self._acquire = acquire
+        self._release = release
+    
+    def __enter__(self):
+        self._acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._release()
\ No newline at end of file
@@ -0,0 +1,117 @@
+# metrics.py
+from collections import Counter
+import atexit
+import functools
+import os
+import time
+
+class Metrics:
+    """Timers e contadores por operação; desligado, custa só um teste de flag
+    
+    CRM_METRICS=1 liga a coleta. CRM_PROFILE=cprofile ou CRM_PROFILE=tracemalloc
+    captura um perfil do processo inteiro, gravado ao sair em CRM_PROFILE_OUTPUT.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.timers = {}
+        self.counters = Counter()
+    
+    def enable(self):
+        self.enabled = True
+    
+    def disable(self):
+        self.enabled = False
+    
+    def reset(self):
+        self.timers = {}
+        self.counters = Counter()
+    
+    def incr(self, name, value=1):
+        if self.enabled:
+            self.counters[name] += value
+    
+    def record(self, name, seconds):
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = {"calls": 0, "total": 0.0, "max": 0.0}
+        timer["calls"] += 1
+        timer["total"] += seconds
+        if seconds > timer["max"]:
+            timer["max"] = seconds
+    
+    def snapshot(self):
+        """Cópia dos valores atuais (para exibir ou serializar)"""
+        return {
+            "timers": {name: dict(timer) for name, timer in self.timers.items()},
+            "counters": dict(self.counters)
+        }
+    
+    def format_table(self):
+        """Tabela de timers (ordenada por tempo total) seguida dos contadores"""
+        lines = [f"{'Operação':<32} | {'Chamadas':>8} | {'Total (ms)':>11} | {'Média (ms)':>10} | {'Máx (ms)':>9}"]
+        lines.append("-" * 82)
+        for name, timer in sorted(self.timers.items(), key=lambda item: -item[1]["total"]):
+            average = timer["total"] / timer["calls"] if timer["calls"] else 0.0
+            lines.append(
+                f"{name:<32} | {timer['calls']:>8} | {timer['total'] * 1000:>11.2f} | "
+                f"{average * 1000:>10.3f} | {timer['max'] * 1000:>9.3f}"
+            )
+        if self.counters:
+            lines.append("")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<32} | {value:>12}")
+        return "\n".join(lines)
+
+metrics = Metrics()
+
+def instrumented(name):
+    """Decorador que mede chamadas e tempo da função quando as métricas estão ligadas"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.record(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+def start_profiling(mode, output=None):
+    """Captura cProfile ou tracemalloc até o fim do processo"""
+    if mode == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        output = output or "crm.prof"
+        
+        def dump():
+            profiler.disable()
+            profiler.dump_stats(output)
+    elif mode == "tracemalloc":
+        import tracemalloc
+        tracemalloc.start(25)
+        output = output or "crm_tracemalloc.txt"
+        
+        def dump():
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            with open(output, "w", encoding="utf-8") as f:
+                f.write(f"atual={current} pico={peak}\n")
+                for stat in snapshot.statistics("lineno")[:50]:
+                    f.write(f"{stat}\n")
+    else:
+        raise ValueError(f"Modo de profiling desconhecido: {mode}")
+    atexit.register(dump)
+
+def configure_from_env():
+    if os.environ.get("CRM_METRICS") == "1":
+        metrics.enable()
+    mode = os.environ.get("CRM_PROFILE")
+    if mode:
+        start_profiling(mode, os.environ.get("CRM_PROFILE_OUTPUT"))
+
+configure_from_env()
\ No newline at end of file
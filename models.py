@@ -1,10 +1,21 @@
 # models.py
 from datetime import date
 from abc import ABC, abstractmethod
+import unicodedata
+
+# Score mínimo para um lead qualificado ser considerado de alto valor
+HIGH_VALUE_SCORE = 80
+
+def normalize_email(email):
+    """Chave canônica de e-mail: Unicode NFKC + casefold (ex.: 'OLHAOLANÇA@GMAIL.COM')"""
+    return unicodedata.normalize("NFKC", email.strip()).casefold()
 
 class BaseModel(ABC):
     """Classe abstrata base para todos os modelos do sistema"""
     
+    # __slots__ em toda a hierarquia: sem __dict__ por instância
+    __slots__ = ("created",)
+    
     def __init__(self, created=None):
         self.created = created or date.today().isoformat()
     
@@ -25,12 +36,16 @@ class BaseModel(ABC):
 class Lead(BaseModel):
     """Classe representando um lead no sistema CRM"""
     
-    def __init__(self, name, email, company="", stage="novo", created=None):
+    __slots__ = ("_name", "_email", "company", "stage", "stage_changed")
+    
+    def __init__(self, name, email, company="", stage="novo", created=None, stage_changed=None):
         super().__init__(created)
         self._name = name
         self._email = email
         self.company = company
         self.stage = stage
+        # Data/hora da última mudança de estágio (None se nunca mudou)
+        self.stage_changed = stage_changed
     
     @property
     def name(self):
@@ -54,13 +69,17 @@ class Lead(BaseModel):
     
     def to_dict(self):
         """Converte o lead para dicionário (compatível com JSON existente)"""
-        return {
+        data = {
             "name": self.name,
             "company": self.company,
             "email": self.email,
             "stage": self.stage,
             "created": self.created
         }
+        # Só grava o campo depois da primeira transição: registros antigos não mudam
+        if self.stage_changed is not None:
+            data["stage_changed"] = self.stage_changed
+        return data
     
     @classmethod
     def from_dict(cls, data):
@@ -70,7 +89,8 @@ class Lead(BaseModel):
             email=data["email"],
             company=data.get("company", ""),
             stage=data.get("stage", "novo"),
-            created=data.get("created")
+            created=data.get("created"),
+            stage_changed=data.get("stage_changed")
         )
     
     def __str__(self):
@@ -79,8 +99,11 @@ class Lead(BaseModel):
 class QualifiedLead(Lead):
     """Classe especializada para leads qualificados com scoring"""
     
-    def __init__(self, name, email, company="", score=0, created=None):
-        super().__init__(name, email, company, "qualificado", created)
+    __slots__ = ("score",)
+    
+    def __init__(self, name, email, company="", score=0, created=None,
+                 stage="qualificado", stage_changed=None):
+        super().__init__(name, email, company, stage, created, stage_changed)
         self.score = max(0, min(100, score))  # Pontuação de 0-100
     
     def to_dict(self):
@@ -98,13 +121,21 @@ class QualifiedLead(Lead):
             email=data["email"],
             company=data.get("company", ""),
             score=data.get("score", 0),
-            created=data.get("created")
+            created=data.get("created"),
+            stage=data.get("stage", "qualificado"),
+            stage_changed=data.get("stage_changed")
         )
         return lead
     
     def is_high_value(self):
         """Método específico para identificar leads de alto valor"""
-        return self.score >= 80
+        return self.score >= HIGH_VALUE_SCORE
     
     def __str__(self):
-        return f"QualifiedLead: {self.name} - Score: {self.score}/100 - {self.company}"
\ No newline at end of file
+        return f"QualifiedLead: {self.name} - Score: {self.score}/100 - {self.company}"
+
+def lead_from_dict(data):
+    """Lead ou QualifiedLead conforme o campo type do registro"""
+    if data.get("type") == "qualified":
+        return QualifiedLead.from_dict(data)
+    return Lead.from_dict(data)
\ No newline at end of file
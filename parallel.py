@@ -0,0 +1,220 @@
+# parallel.py
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import heapq
+import json
+import os
+from models import lead_from_dict
+from indexes import search_text
+from stats import LeadStats
+from storage import record_key, file_signature
+from metrics import instrumented, metrics
+
+# Abaixo deste tamanho (bytes) a varredura fica no processo atual: subir o
+# pool custa mais do que processar o arquivo inteiro em um núcleo
+PARALLEL_THRESHOLD = 16 * 1024 * 1024
+
+def chunk_ranges(path, chunks):
+    """Divide o arquivo em até `chunks` faixas de bytes terminadas em quebra de linha"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    chunks = max(1, min(chunks, size))
+    ranges = []
+    start = 0
+    with open(path, "rb") as f:
+        for i in range(1, chunks + 1):
+            if start >= size:
+                break
+            end = size if i == chunks else max(start, size * i // chunks)
+            if end < size:
+                # Avança até o fim da linha em que o corte caiu
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def _read_range(path, start, end, skip_keys, found):
+    """(índice local, registro) de uma faixa; chaves em skip_keys só têm a posição anotada"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        raw = f.read(end - start)
+    index = 0
+    for line in raw.split(b"\n"):
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        key = record_key(data) if skip_keys else None
+        if key in skip_keys:
+            found[key] = index
+        else:
+            yield index, data
+        index += 1
+    found[None] = index
+
+def _run_chunk(path, start, end, skip_keys, task, args):
+    """Executado no processo do pool: aplica a tarefa a uma faixa do arquivo"""
+    found = {}
+    records = _read_range(path, start, end, skip_keys, found)
+    result = task(records, *args)
+    # Garante a contagem de linhas mesmo se a tarefa parou antes do fim
+    for _ in records:
+        pass
+    lines = found.pop(None)
+    return result, lines, found
+
+# ---- Tarefas (funções de módulo: precisam ser serializáveis pelo pool) ----
+
+def search_chunk(records, query, field=None):
+    """Registros cujo texto pesquisável contém a consulta (já em minúsculas)"""
+    return [
+        (index, data) for index, data in records
+        if query in search_text(lead_from_dict(data), field)
+    ]
+
+def stats_chunk(records):
+    """Contadores (LeadStats) da faixa"""
+    return LeadStats.from_leads(lead_from_dict(data) for _, data in records)
+
+class _RowSink(list):
+    """Destino do csv.writer que guarda cada linha formatada como um item"""
+    write = list.append
+
+def csv_chunk(records, fieldnames):
+    """Linhas de CSV já formatadas, com a posição de cada uma"""
+    rows = _RowSink()
+    writer = csv.DictWriter(rows, fieldnames=fieldnames, extrasaction="ignore")
+    positions = []
+    for index, data in records:
+        writer.writerow(data)
+        positions.append(index)
+    return positions, list(rows)
+
+class ScanResult:
+    """Resultados por faixa, na ordem do arquivo, e posições globais das chaves sobrepostas"""
+    
+    def __init__(self, chunks, lines, found):
+        # chunks: lista de (resultado, deslocamento global da faixa)
+        self.chunks = chunks
+        self.lines = lines
+        self.found = found
+
+class ParallelScanner:
+    """Varre um arquivo JSON Lines em faixas de bytes, em paralelo (ProcessPoolExecutor)
+    
+    Cada tarefa recebe um iterável de (índice local, registro) e devolve um
+    resultado por faixa; o chamador junta os resultados na ordem original.
+    Registros cujas chaves estão em skip_keys (sobrescritos pelo log) são
+    pulados, mas suas posições são devolvidas em ScanResult.found.
+    """
+    
+    def __init__(self, workers=None, threshold=PARALLEL_THRESHOLD):
+        self.workers = workers or os.cpu_count() or 1
+        self.threshold = threshold
+        self._pool = None
+    
+    def should_parallelize(self, path):
+        try:
+            return self.workers > 1 and os.path.getsize(path) >= self.threshold
+        except FileNotFoundError:
+            return False
+    
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+    
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
+    @instrumented("parallel.scan")
+    def scan(self, path, task, args=(), skip_keys=frozenset()):
+        skip_keys = frozenset(skip_keys)
+        if not os.path.exists(path):
+            return ScanResult([], 0, {})
+        
+        if self.should_parallelize(path):
+            # Mais faixas que processos equilibra a carga entre eles
+            ranges = chunk_ranges(path, self.workers * 4)
+            pool = self._get_pool()
+            futures = [
+                pool.submit(_run_chunk, str(path), start, end, skip_keys, task, args)
+                for start, end in ranges
+            ]
+            outputs = [future.result() for future in futures]
+            metrics.incr("parallel.chunks", len(ranges))
+        else:
+            outputs = [_run_chunk(str(path), 0, os.path.getsize(path), skip_keys, task, args)]
+        
+        chunks, found, offset = [], {}, 0
+        for result, lines, chunk_found in outputs:
+            chunks.append((result, offset))
+            for key, index in chunk_found.items():
+                found[key] = offset + index
+            offset += lines
+        return ScanResult(chunks, offset, found)
+
+def _scan_storage(scanner, storage, task, args=()):
+    """Varre o snapshot de um LogStorage e posiciona os registros do log
+    
+    Retorna (resultado da varredura, [(posição, registro)] do log, em ordem)
+    ou None se o snapshot foi substituído (compactação) durante a leitura.
+    """
+    path, overlay, moved = storage.scan_plan()
+    before = file_signature(path)
+    scan = scanner.scan(path, task, args, skip_keys=overlay.keys())
+    if file_signature(path) != before:
+        return None
+    
+    extra = []
+    next_position = scan.lines
+    for key, record in overlay.items():
+        if record is None:
+            continue
+        if key in scan.found and key not in moved:
+            extra.append((scan.found[key], record))
+        else:
+            extra.append((next_position, record))
+            next_position += 1
+    extra.sort(key=lambda item: item[0])
+    return scan, extra
+
+def parallel_search(scanner, storage, query, field=None):
+    """Registros que contêm a consulta, na ordem de storage.load(); None em conflito"""
+    scanned = _scan_storage(scanner, storage, search_chunk, (query, field))
+    if scanned is None:
+        return None
+    scan, extra = scanned
+    matches = [
+        (offset + index, data) for result, offset in scan.chunks for index, data in result
+    ]
+    merged = heapq.merge(matches, search_chunk(extra, query, field), key=lambda item: item[0])
+    return [data for _, data in merged]
+
+def parallel_stats(scanner, storage):
+    """LeadStats de todos os registros; None em conflito"""
+    scanned = _scan_storage(scanner, storage, stats_chunk)
+    if scanned is None:
+        return None
+    scan, extra = scanned
+    stats = stats_chunk(extra)
+    for result, _ in scan.chunks:
+        stats.merge(result)
+    return stats
+
+def parallel_csv_rows(scanner, storage, fieldnames):
+    """Linhas de CSV formatadas em paralelo, na ordem de storage.load(); None em conflito"""
+    scanned = _scan_storage(scanner, storage, csv_chunk, (fieldnames,))
+    if scanned is None:
+        return None
+    scan, extra = scanned
+    streams = [
+        zip([offset + index for index in positions], rows)
+        for (positions, rows), offset in scan.chunks
+    ]
+    streams.append(zip(*csv_chunk(extra, fieldnames)))
+    return (row for _, row in heapq.merge(*streams, key=lambda item: item[0]))
\ No newline at end of file
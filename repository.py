@@ -1,111 +1,737 @@
 # repository.py
 from pathlib import Path
 import json
-import csv
-from models import Lead, QualifiedLead
+import threading
+from itertools import islice
+import heapq
+from models import Lead, QualifiedLead, normalize_email
+from storage import create_storage
+from indexes import (
+    EmailIndex, TrigramIndex, ScoreIndex, DateIndex, SEARCH_FIELDS, search_text, created_day
+)
+from exporters import CsvExporter
+from lead_table import LeadTable
+from stats import LeadStats, StatsFile
+from locking import FileLock, GroupCommit
+from metrics import instrumented, metrics
+from parallel import ParallelScanner, parallel_search, parallel_stats, parallel_csv_rows
+from snapshot import SnapshotReader, write_snapshot
+
+def _parse_cursor(cursor):
+    """Cursores são opacos para o chamador; aqui, a posição inicial em texto"""
+    if cursor is None:
+        return 0
+    try:
+        position = int(cursor)
+    except (TypeError, ValueError):
+        raise ValueError(f"Cursor inválido: {cursor}")
+    if position < 0:
+        raise ValueError(f"Cursor inválido: {cursor}")
+    return position
 
 class LeadRepository:
     """Classe para gerenciar persistência de leads com herança"""
     
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, storage="json", cache=True, group_commit_window=None,
+                 parallel_workers=None, serializer=None):
+        """storage: "json" (array único, padrão), "log" (append-only), "partitioned"
+        (um arquivo por mês de criação) ou instância de motor
+        cache: mantém os leads desserializados em memória entre chamadas
+        group_commit_window: segundos para agrupar adições concorrentes de várias
+        threads em uma única gravação (None desativa)
+        parallel_workers: processos para varreduras sem cache do motor "log"
+        (None = núcleos disponíveis, 1 desativa)
+        serializer: formato do motor "json" ("json", "json-compact", "jsonl" ou
+        "binary"); None mantém o formato atual do arquivo"""
         self.DATA_DIR = Path(__file__).resolve().parent / "data"
-        self.DATA_DIR.mkdir(exist_ok=True)
-        self.DB_PATH = db_path or (self.DATA_DIR / "leads.json")
+        # data/ só é criado quando um caminho padrão é usado
+        if db_path is None:
+            self.DATA_DIR.mkdir(exist_ok=True)
+        self.DB_PATH = Path(db_path) if db_path else (self.DATA_DIR / "leads.json")
+        options = {"serializer": serializer} if serializer else {}
+        if options and storage != "json":
+            raise ValueError("serializer só se aplica ao motor json")
+        self.storage = create_storage(storage, self.DB_PATH, **options)
+        self.cache_enabled = cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = None
+        self._cache_signature = None
+        # Protege cache e índices entre threads (ex.: leituras simultâneas no
+        # server.py): uma thread não guarda um índice montado sobre uma lista
+        # que outra thread acabou de substituir
+        self._state_lock = threading.RLock()
+        self._email_index = None
+        self._trigram_index = None
+        self._score_index = None
+        self._date_index = None
+        # Contadores persistidos ao lado dos dados (leads.stats.json)
+        self._stats = None
+        self._stats_signature = None
+        self._stats_file = StatsFile(self.DB_PATH.with_suffix(".stats.json"))
+        # Toda gravação (leitura-modificação-escrita) acontece sob este lock,
+        # compartilhado por todos os processos que usam o mesmo arquivo
+        self._lock = FileLock(self.DB_PATH.with_suffix(".lock"))
+        self._group_commit = None
+        if group_commit_window is not None:
+            self._group_commit = GroupCommit(self._add_now, group_commit_window)
+        self._scanner = ParallelScanner(parallel_workers)
     
+    @instrumented("repository.load_leads")
     def _load_leads(self):
-        """Carrega leads do arquivo JSON - compatível com estrutura existente"""
-        if not self.DB_PATH.exists():
-            return []
-        try:
-            data = json.loads(self.DB_PATH.read_text(encoding="utf-8"))
-            return self._deserialize_leads(data)
-        except json.JSONDecodeError:
-            return []
+        """Carrega leads do motor de armazenamento - compatível com estrutura existente
+        
+        Com cache ativo, a lista retornada é compartilhada: não deve ser alterada.
+        """
+        if not self.cache_enabled:
+            return self._deserialize_leads(self.storage.load())
+        
+        with self._state_lock:
+            signature = self.storage.signature()
+            if self._cache is not None and signature == self._cache_signature:
+                self.cache_hits += 1
+                metrics.incr("repository.cache_hits")
+                return self._cache
+            
+            # Arquivo alterado externamente (ou primeira leitura): recarrega tudo
+            self.cache_misses += 1
+            metrics.incr("repository.cache_misses")
+            self._cache = self._deserialize_leads(self.storage.load())
+            self._cache_signature = signature
+            self._reset_indexes()
+            return self._cache
+    
+    def _reset_indexes(self):
+        """Índices são reconstruídos sob demanda a partir do cache"""
+        self._email_index = None
+        self._trigram_index = None
+        self._score_index = None
+        self._date_index = None
+    
+    def _get_email_index(self):
+        """Retorna (índice de e-mail, leads em cache), construindo o índice se preciso"""
+        with self._state_lock:
+            leads = self._load_leads()
+            if self._email_index is None:
+                self._email_index = EmailIndex(leads)
+            return self._email_index, leads
+    
+    def _get_trigram_index(self):
+        """Retorna (índice de trigramas, leads em cache), construindo o índice se preciso"""
+        with self._state_lock:
+            leads = self._load_leads()
+            if self._trigram_index is None:
+                self._trigram_index = TrigramIndex(leads)
+            return self._trigram_index, leads
+    
+    def _use_parallel_scan(self):
+        """Sem cache, arquivos JSON Lines grandes são varridos em paralelo"""
+        if self.cache_enabled or not hasattr(self.storage, "scan_plan"):
+            return False
+        return self._scanner.should_parallelize(self.storage.snapshot_path)
+    
+    def _cache_is_fresh(self):
+        return (self._cache is not None
+                and self.storage.signature() == self._cache_signature)
+    
+    def _write(self, write, apply_to_cache, apply_to_stats=None):
+        """Executa uma gravação própria e aplica a mesma mudança ao cache e às estatísticas"""
+        with self._lock:
+            self._write_locked(write, apply_to_cache, apply_to_stats)
+    
+    def _write_locked(self, write, apply_to_cache, apply_to_stats):
+        signature = self.storage.signature()
+        fresh = self.cache_enabled and self._cache is not None \
+            and signature == self._cache_signature
+        stats = self._stats_for(signature) if apply_to_stats else None
+        
+        write()
+        
+        with self._state_lock:
+            if fresh:
+                apply_to_cache(self._cache)
+                self._cache_signature = self.storage.signature()
+            else:
+                self.invalidate_cache()
+        
+        if stats is not None:
+            apply_to_stats(stats)
+            # Ainda sob o lock: a assinatura atual é a da gravação recém-feita
+            self._set_stats(stats, self.storage.signature())
+        else:
+            self._stats = None
+    
+    def invalidate_cache(self):
+        """Descarta os leads em memória; a próxima leitura relê o arquivo"""
+        with self._state_lock:
+            self._cache = None
+            self._cache_signature = None
+            self._reset_indexes()
+    
+    def _stats_for(self, signature):
+        """Contadores válidos para a assinatura informada, sem varrer os dados
+        
+        Usa os contadores em memória ou os persistidos; None se estiverem
+        desatualizados (a próxima consulta reconstrói com uma varredura).
+        """
+        if self._stats is not None and self._stats_signature == signature:
+            return self._stats
+        return self._stats_file.load(signature)
+    
+    def _set_stats(self, stats, signature):
+        """Guarda os contadores em memória e em disco com a assinatura dos dados contados
+        
+        signature deve ser lida antes da varredura (ou sob o lock, logo após a
+        própria gravação): a assinatura atual pode já incluir gravações de
+        outro processo que os contadores não viram.
+        """
+        self._stats = stats
+        self._stats_signature = signature
+        self._stats_file.save(stats, signature)
+    
+    def _get_stats(self):
+        """Contadores atuais: em memória, do arquivo de estatísticas ou por varredura"""
+        signature = self.storage.signature()
+        stats = self._stats_for(signature)
+        if stats is None:
+            return self.rebuild_stats()
+        if stats is not self._stats:
+            self._stats = stats
+            self._stats_signature = signature
+        return stats
+    
+    @instrumented("repository.rebuild_stats")
+    def rebuild_stats(self):
+        """Reconstrói os contadores com uma varredura completa e os persiste
+        
+        Roda sob o lock de gravação: nenhum outro processo altera os dados
+        entre a leitura da assinatura e o fim da varredura.
+        """
+        with self._lock:
+            signature = self.storage.signature()
+            stats = parallel_stats(self._scanner, self.storage) if self._use_parallel_scan() else None
+            if stats is None:
+                stats = LeadStats.from_leads(self._load_leads())
+            self._set_stats(stats, signature)
+        return stats
+    
+    @instrumented("repository.verify_stats")
+    def verify_stats(self):
+        """Compara os contadores mantidos com uma varredura completa"""
+        current = self._get_stats()
+        expected = LeadStats.from_leads(self._load_leads())
+        return {"ok": current == expected, "differences": current.differences(expected)}
+    
+    def cache_stats(self):
+        """Retorna contadores de acerto/falha do cache"""
+        return {
+            "enabled": self.cache_enabled,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "cached_leads": len(self._cache) if self._cache is not None else 0
+        }
     
+    @instrumented("repository.deserialize_leads")
     def _deserialize_leads(self, data_list):
         """Desserializa dados JSON para objetos Lead/QualifiedLead (polimorfismo)"""
-        leads = []
-        for data in data_list:
-            if data.get("type") == "qualified":
-                leads.append(QualifiedLead.from_dict(data))
-            else:
-                leads.append(Lead.from_dict(data))
+        qualified_from_dict, regular_from_dict = QualifiedLead.from_dict, Lead.from_dict
+        leads = [
+            qualified_from_dict(data) if data.get("type") == "qualified" else regular_from_dict(data)
+            for data in data_list
+        ]
+        metrics.incr("repository.leads_deserialized", len(leads))
         return leads
     
+    @instrumented("repository.save_leads")
     def _save_leads(self, leads):
         """Salva lista de leads no arquivo JSON"""
-        serialized_data = [lead.to_dict() for lead in leads]
-        self.DB_PATH.write_text(
-            json.dumps(serialized_data, ensure_ascii=False, indent=2), 
-            encoding="utf-8"
-        )
+        leads = list(leads)
+        
+        def apply_to_cache(cache):
+            cache[:] = leads
+            self._reset_indexes()
+        
+        with self._lock:
+            self._write_locked(
+                lambda: self.storage.save([lead.to_dict() for lead in leads]),
+                apply_to_cache,
+                None
+            )
+            self._set_stats(LeadStats.from_leads(leads), self.storage.signature())
     
+    @instrumented("repository.list_all")
     def list_all(self):
         """Retorna todos os leads"""
-        return self._load_leads()
+        return list(self._load_leads())
+    
+    @instrumented("repository.list_page")
+    def list_page(self, cursor=None, limit=20, stage=None, qualified=None):
+        """Retorna uma página de leads a partir do cursor (posição no armazenamento)
+        
+        stage / qualified filtram os leads; next_cursor é None na última página.
+        Sem cache, só os registros da página viram objetos Lead.
+        """
+        start = _parse_cursor(cursor)
+        if limit < 1:
+            raise ValueError("limit deve ser positivo")
+        
+        if self.cache_enabled:
+            leads = self._load_leads()
+            matches = (
+                (position, leads[position]) for position in range(start, len(leads))
+                if (stage is None or leads[position].stage == stage)
+                and (qualified is None or isinstance(leads[position], QualifiedLead) == qualified)
+            )
+        else:
+            if hasattr(self.storage, "iter_records"):
+                # Partições sem o estágio pedido nem são lidas
+                rows = self.storage.iter_records(start, stage=stage)
+            else:
+                rows = enumerate(islice(self.storage.load(), start, None), start)
+            matches = (
+                (position, data) for position, data in rows
+                if (stage is None or data.get("stage", "novo") == stage)
+                and (qualified is None or (data.get("type") == "qualified") == qualified)
+            )
+        
+        # Lê um item além do limite para saber se existe próxima página
+        window = list(islice(matches, limit + 1))
+        items = [item for _, item in window[:limit]]
+        if not self.cache_enabled:
+            items = self._deserialize_leads(items)
+        next_cursor = str(window[limit][0]) if len(window) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+    
+    @instrumented("repository.list_table")
+    def list_table(self):
+        """Retorna todos os leads em formato colunar (LeadTable) para leituras em massa
+        
+        A tabela é montada direto dos registros armazenados, sem criar um
+        objeto Lead por registro; use com cache=False para não manter as
+        duas representações em memória.
+        """
+        return LeadTable.from_records(self.storage.load())
     
     def add(self, lead):
         """Adiciona um novo lead (polimorfismo na aceitação)"""
-        if not isinstance(lead, (Lead, QualifiedLead)):
-            raise TypeError("Objeto deve ser do tipo Lead ou QualifiedLead")
+        self.add_many([lead])
+        return lead
+    
+    @instrumented("repository.add_many")
+    def add_many(self, leads):
+        """Adiciona vários leads com uma única gravação"""
+        leads = list(leads)
+        for lead in leads:
+            if not isinstance(lead, (Lead, QualifiedLead)):
+                raise TypeError("Objeto deve ser do tipo Lead ou QualifiedLead")
+        if not leads:
+            return leads
+        if self._group_commit is not None:
+            self._group_commit.submit([(lead, False) for lead in leads])
+            return leads
+        return self._add_many_now(leads)
+    
+    def add_if_absent(self, lead):
+        """Adiciona o lead só se o e-mail ainda não existir; retorna False se existir"""
+        return not self.add_many_if_absent([lead])
+    
+    @instrumented("repository.add_many_if_absent")
+    def add_many_if_absent(self, leads):
+        """Adiciona só os leads cujo e-mail ainda não existe; retorna os e-mails recusados
+        
+        Checagem (uma consulta por lote) e gravação acontecem sob o mesmo
+        lock: outro produtor (thread ou processo) não grava o mesmo e-mail
+        entre as duas. E-mail repetido no lote: vale a primeira ocorrência.
+        Com group commit, a checagem é feita na gravação agrupada.
+        """
+        leads = list(leads)
+        for lead in leads:
+            if not isinstance(lead, (Lead, QualifiedLead)):
+                raise TypeError("Objeto deve ser do tipo Lead ou QualifiedLead")
+        if not leads:
+            return []
+        
+        items = [(lead, True) for lead in leads]
+        if self._group_commit is not None:
+            added = self._group_commit.submit(items)
+        else:
+            added = self._add_now(items)
+        return [lead.email for lead, ok in zip(leads, added) if not ok]
+    
+    def _add_now(self, items):
+        """Grava pares (lead, só se ausente) de uma vez; retorna se cada lead foi gravado
         
-        leads = self._load_leads()
-        leads.append(lead)
-        self._save_leads(leads)
+        Leads "só se ausente" são checados, sob o lock da gravação, contra os
+        e-mails já gravados e os anteriores do mesmo lote.
+        """
+        with self._lock:
+            checked = [lead.email for lead, if_absent in items if if_absent]
+            existing = iter(self.get_many_by_email(checked) if checked else ())
+            accepted, added, seen = [], [], set()
+            for lead, if_absent in items:
+                key = normalize_email(lead.email)
+                if if_absent and (next(existing) is not None or key in seen):
+                    added.append(False)
+                    continue
+                seen.add(key)
+                accepted.append(lead)
+                added.append(True)
+            if accepted:
+                self._add_many_now(accepted)
+        return added
+    
+    def _add_many_now(self, leads):
+        def apply_to_cache(cache):
+            for lead in leads:
+                cache.append(lead)
+                self._index_new_lead(lead, len(cache) - 1)
+        
+        def apply_to_stats(stats):
+            for lead in leads:
+                stats.add(lead)
+        
+        self._write(
+            lambda: self.storage.append([lead.to_dict() for lead in leads]),
+            apply_to_cache,
+            apply_to_stats
+        )
+        return leads
+    
+    def _index_new_lead(self, lead, position):
+        """Atualiza os índices já construídos com um lead recém-adicionado"""
+        if self._email_index is not None:
+            self._email_index.add(lead.email, position)
+        if self._trigram_index is not None:
+            self._trigram_index.add(lead, position)
+        if self._score_index is not None:
+            self._score_index.add(lead, position)
+        if self._date_index is not None:
+            self._date_index.add(lead, position)
+    
+    @instrumented("repository.update")
+    def update(self, lead):
+        """Substitui o lead de mesmo e-mail (ex.: promoção) sem reescrever os demais"""
+        self.update_many([lead])
         return lead
     
-    def search(self, query):
-        """Busca leads por termo (nome, empresa ou email)"""
+    @instrumented("repository.update_many")
+    def update_many(self, leads):
+        """Substitui vários leads (pelo e-mail) com uma única gravação"""
+        leads = list(leads)
+        for lead in leads:
+            if not isinstance(lead, (Lead, QualifiedLead)):
+                raise TypeError("Objeto deve ser do tipo Lead ou QualifiedLead")
+        # E-mail repetido no lote: vale a última versão, como no armazenamento
+        leads = list({normalize_email(lead.email): lead for lead in leads}.values())
+        if not leads:
+            return leads
+        
+        with self._lock:
+            # Versões anteriores dos leads, lidas sob o lock, para ajustar os contadores
+            previous = self.get_many_by_email([lead.email for lead in leads])
+            self._update_locked(leads, previous)
+        return leads
+    
+    @instrumented("repository.transition_many")
+    def transition_many(self, emails, transition):
+        """Lê, altera e grava leads sob um único lock
+        
+        transition recebe os leads atuais (ou None) na ordem de emails e
+        retorna as novas versões a gravar. Outro produtor não grava esses
+        leads entre a leitura e a gravação. Retorna as versões gravadas.
+        """
+        emails = list(emails)
+        with self._lock:
+            return self.update_many(transition(self.get_many_by_email(emails)))
+    
+    def _update_locked(self, leads, previous):
+        def apply_to_cache(cache):
+            # O arquivo já mudou: usa o cache diretamente, sem nova verificação
+            if self._email_index is None:
+                self._email_index = EmailIndex(cache)
+            index = self._email_index
+            for lead in leads:
+                position = index.get(lead.email)
+                if position is None:
+                    cache.append(lead)
+                    self._index_new_lead(lead, len(cache) - 1)
+                    continue
+                if self._trigram_index is not None:
+                    self._trigram_index.replace(cache[position], lead, position)
+                if self._score_index is not None:
+                    self._score_index.replace(cache[position], lead, position)
+                if self._date_index is not None:
+                    self._date_index.replace(cache[position], lead, position)
+                cache[position] = lead
+        
+        def apply_to_stats(stats):
+            for lead, old_lead in zip(leads, previous):
+                if old_lead is None:
+                    stats.add(lead)
+                else:
+                    stats.replace(old_lead, lead)
+        
+        self._write(
+            lambda: self.storage.update([lead.to_dict() for lead in leads]),
+            apply_to_cache,
+            apply_to_stats
+        )
+    
+    @instrumented("repository.remove_many")
+    def remove_many(self, emails):
+        """Remove os leads com os e-mails informados com uma única gravação"""
+        keys = {normalize_email(email) for email in emails}
+        if not keys:
+            return []
+        
+        with self._lock:
+            removed = [lead for lead in self.get_many_by_email(keys) if lead is not None]
+            
+            def apply_to_cache(cache):
+                # As posições mudam: os índices são reconstruídos sob demanda
+                cache[:] = [lead for lead in cache if normalize_email(lead.email) not in keys]
+                self._reset_indexes()
+            
+            def apply_to_stats(stats):
+                for lead in removed:
+                    stats.remove(lead)
+            
+            self._write(lambda: self.storage.delete(keys), apply_to_cache, apply_to_stats)
+        return removed
+    
+    @instrumented("repository.search")
+    def search(self, query, field=None, limit=None):
+        """Busca leads por termo (nome, empresa ou email)
+        
+        field: restringe a um campo ("name", "company" ou "email")
+        limit: número máximo de resultados
+        """
         if not query:
             return []
+        if field is not None and field not in SEARCH_FIELDS:
+            raise ValueError(f"Campo de busca inválido: {field}")
         
         query = query.lower()
-        leads = self._load_leads()
-        results = []
+        if self._use_parallel_scan():
+            records = parallel_search(self._scanner, self.storage, query, field)
+            if records is not None:
+                return self._deserialize_leads(records[:limit])
         
-        for lead in leads:
-            search_text = f"{lead.name} {lead.company} {lead.email}".lower()
-            if query in search_text:
+        candidates = None
+        if self.cache_enabled:
+            index, leads = self._get_trigram_index()
+            candidates = index.candidates(query)
+        else:
+            leads = self._load_leads()
+        
+        # Consultas com menos de 3 caracteres (ou sem cache) varrem tudo
+        if candidates is None:
+            candidates = range(len(leads))
+        
+        results = []
+        for position in candidates:
+            lead = leads[position]
+            if query in search_text(lead, field):
                 results.append(lead)
+                if limit is not None and len(results) >= limit:
+                    break
         
         return results
     
+    @instrumented("repository.get_by_email")
     def get_by_email(self, email):
-        """Busca lead específico por e-mail"""
-        leads = self._load_leads()
-        for lead in leads:
-            if lead.email.lower() == email.lower():
-                return lead
-        return None
+        """Busca lead específico por e-mail (O(1) via índice hash com cache ativo)"""
+        if not self.cache_enabled:
+            key = normalize_email(email)
+            for lead in self._load_leads():
+                if normalize_email(lead.email) == key:
+                    return lead
+            return None
+        
+        index, leads = self._get_email_index()
+        position = index.get(email)
+        return leads[position] if position is not None else None
+    
+    @instrumented("repository.get_many_by_email")
+    def get_many_by_email(self, emails):
+        """Leads (ou None) para cada e-mail, na mesma ordem, com uma única leitura"""
+        if self.cache_enabled:
+            index, leads = self._get_email_index()
+            positions = (index.get(email) for email in emails)
+            return [leads[position] if position is not None else None for position in positions]
+        
+        by_key = {}
+        for lead in self._load_leads():
+            by_key.setdefault(normalize_email(lead.email), lead)
+        return [by_key.get(normalize_email(email)) for email in emails]
+    
+    @instrumented("repository.write_snapshot")
+    def write_snapshot(self, path=None):
+        """Grava um snapshot somente leitura (leitura via mmap com SnapshotReader)
+        
+        Retorna o caminho do arquivo. Os metadados guardam a assinatura do
+        armazenamento no momento da gravação, para o leitor saber se está defasado.
+        """
+        path = Path(path) if path else self.DB_PATH.with_suffix(".snap")
+        with self._lock:
+            signature = self.storage.signature()
+            if self.cache_enabled:
+                records = (lead.to_dict() for lead in self._load_leads())
+            else:
+                records = self.storage.load()
+            write_snapshot(path, records, {"source_signature": signature})
+        return path
+    
+    def snapshot_is_current(self, path=None):
+        """Indica se o snapshot reflete o estado atual do armazenamento"""
+        path = Path(path) if path else self.DB_PATH.with_suffix(".snap")
+        try:
+            with SnapshotReader(path) as reader:
+                stored = reader.meta.get("source_signature")
+        except (FileNotFoundError, ValueError):
+            return False
+        return stored == json.loads(json.dumps(self.storage.signature()))
     
     def export_csv(self, path=None):
         """Exporta leads para CSV - mantém funcionalidade existente"""
+        report = self.export(path)
+        return report["files"][0] if report else None
+    
+    @instrumented("repository.export")
+    def export(self, path=None, compress=False, rows_per_file=None, partition_by=None):
+        """Exporta em streaming (gzip e divisão por linhas/campo opcionais)
+        
+        Retorna relatório com arquivos gerados e vazão, ou None se o arquivo
+        de destino estiver bloqueado.
+        """
+        if not path:
+            self.DATA_DIR.mkdir(exist_ok=True)
         path = Path(path) if path else (self.DATA_DIR / "leads.csv")
-        leads = self._load_leads()
+        exporter = CsvExporter(
+            path,
+            include_qualified=self.has_qualified(),
+            compress=compress,
+            rows_per_file=rows_per_file,
+            partition_by=partition_by
+        )
         
         try:
-            with path.open("w", newline="", encoding="utf-8") as f:
-                # Fieldnames compatíveis com estrutura existente
-                fieldnames = ["name", "company", "email", "stage", "created"]
-                
-                # Verifica se há leads qualificados para adicionar campo score
-                if any(isinstance(lead, QualifiedLead) for lead in leads):
-                    fieldnames.append("score")
-                    fieldnames.append("type")
-                
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for lead in leads:
-                    writer.writerow(lead.to_dict())
-            
-            return path
+            if self._use_parallel_scan() and rows_per_file is None and partition_by is None:
+                rows = parallel_csv_rows(self._scanner, self.storage, exporter.fieldnames)
+                if rows is not None:
+                    return exporter.write_rendered(rows)
+            # to_dict() é chamado linha a linha, conforme o CSV é escrito
+            return exporter.write(lead.to_dict() for lead in self._load_leads())
         except PermissionError:
             return None
     
+    def has_qualified(self):
+        """Indica se há leads qualificados (contador mantido incrementalmente)"""
+        return self._get_stats().qualified > 0
+    
+    @instrumented("repository.count")
     def count(self):
         """Retorna quantidade total de leads"""
-        return len(self._load_leads())
+        return self._get_stats().total
+    
+    @instrumented("repository.list_qualified")
+    def list_qualified(self):
+        """Retorna apenas leads qualificados"""
+        return [lead for lead in self._load_leads() if isinstance(lead, QualifiedLead)]
+    
+    def _get_score_index(self):
+        """Retorna (índice de score, leads em cache), construindo o índice se preciso"""
+        with self._state_lock:
+            leads = self._load_leads()
+            if self._score_index is None:
+                self._score_index = ScoreIndex(leads)
+            return self._score_index, leads
+    
+    @instrumented("repository.top_leads")
+    def top_leads(self, k):
+        """Os k leads qualificados de maior score (índice ordenado com cache ativo)"""
+        if k < 1:
+            return []
+        if not self.cache_enabled:
+            return heapq.nlargest(k, self.list_qualified(), key=lambda lead: lead.score)
+        
+        index, leads = self._get_score_index()
+        return [leads[position] for position in index.top(k)]
+    
+    @instrumented("repository.leads_in_score_range")
+    def leads_in_score_range(self, low, high):
+        """Leads qualificados com low <= score <= high, do maior para o menor score"""
+        if not self.cache_enabled:
+            leads = [lead for lead in self.list_qualified() if low <= lead.score <= high]
+            return sorted(leads, key=lambda lead: -lead.score)
+        
+        index, leads = self._get_score_index()
+        return [leads[position] for position in index.between(low, high)]
+    
+    def _get_date_index(self):
+        """Retorna (índice de datas, leads em cache), construindo o índice se preciso"""
+        with self._state_lock:
+            leads = self._load_leads()
+            if self._date_index is None:
+                self._date_index = DateIndex(leads)
+            return self._date_index, leads
+    
+    @instrumented("repository.leads_between")
+    def leads_between(self, start, end):
+        """Leads criados entre start e end (datas ISO, inclusive), por data de criação"""
+        if not self.cache_enabled:
+            if hasattr(self.storage, "iter_records"):
+                # Só as partições cujos meses cruzam a faixa são lidas
+                rows = self.storage.iter_records(created_from=start, created_to=end)
+                leads = self._deserialize_leads(
+                    data for _, data in rows if start <= (data.get("created") or "")[:10] <= end
+                )
+            else:
+                leads = [lead for lead in self.list_all() if start <= created_day(lead) <= end]
+            return sorted(leads, key=created_day)
+        
+        index, leads = self._get_date_index()
+        return [leads[position] for position in index.between(start, end)]
+    
+    @instrumented("repository.archive_partitions")
+    def archive_partitions(self, before):
+        """Compacta as partições de meses anteriores a before (AAAA-MM); motor "partitioned"
+        
+        O conteúdo não muda: cache e contadores continuam válidos.
+        """
+        if not hasattr(self.storage, "archive"):
+            raise ValueError("Arquivamento exige o motor partitioned")
+        archived = []
+        self._write(
+            lambda: archived.extend(self.storage.archive(before)),
+            lambda cache: None,
+            lambda stats: None
+        )
+        return archived
+    
+    @instrumented("repository.get_stats")
+    def get_stats(self):
+        """Retorna contagens de leads (total, qualificados, high-value, regulares)"""
+        return self._get_stats().as_dict()
+    
+    @instrumented("repository.stage_counts")
+    def stage_counts(self):
+        """Quantidade de leads por estágio"""
+        return dict(self._get_stats().by_stage)
+    
+    @instrumented("repository.daily_counts")
+    def daily_counts(self):
+        """Quantidade de leads por dia de criação"""
+        return dict(self._get_stats().by_day)
 
-# Instância global para compatibilidade
-lead_repository = LeadRepository()
\ No newline at end of file
+def __getattr__(name):
+    """Instância global para compatibilidade, criada no primeiro acesso
+    
+    Importar o módulo não cria data/ nem abre arquivos: comandos que usam
+    outro caminho (ou só exibem ajuda) não pagam por ela.
+    """
+    if name == "lead_repository":
+        global lead_repository
+        lead_repository = LeadRepository()
+        return lead_repository
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
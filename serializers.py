@@ -0,0 +1,114 @@
+# serializers.py
+import json
+import marshal
+import struct
+import sys
+from pathlib import Path
+
+class JsonSerializer:
+    """Array JSON indentado: formato original do leads.json (legível, mas grande)"""
+    
+    name = "json"
+    
+    def dumps(self, records):
+        return json.dumps(records, ensure_ascii=False, indent=2).encode("utf-8")
+    
+    def loads(self, raw):
+        try:
+            return json.loads(raw.decode("utf-8"))
+        except json.JSONDecodeError:
+            return []
+
+class CompactJsonSerializer(JsonSerializer):
+    """Array JSON sem indentação nem espaços: mesmo leitor, arquivo menor"""
+    
+    name = "json-compact"
+    
+    def dumps(self, records):
+        return json.dumps(records, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class JsonLinesSerializer:
+    """Um registro JSON por linha"""
+    
+    name = "jsonl"
+    
+    def dumps(self, records):
+        return "".join(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for record in records
+        ).encode("utf-8")
+    
+    def loads(self, raw):
+        return [json.loads(line) for line in raw.decode("utf-8").splitlines() if line.strip()]
+
+class BinarySerializer:
+    """Registros como tuplas em marshal, precedidos de um cabeçalho versionado
+    
+    Cabeçalho: MAGIC, versão do formato e versão do marshal usada na gravação.
+    O marshal pode mudar entre versões do Python: um arquivo gravado por uma
+    versão mais nova é recusado com erro claro (converta de volta para JSON).
+    """
+    
+    name = "binary"
+    MAGIC = b"CRMLEADS"
+    VERSION = 1
+    HEADER = struct.Struct("<8sHH")
+    # Campos conhecidos viram colunas; outros campos vão para o dicionário "extra"
+    FIELDS = ("name", "company", "email", "stage", "created", "score", "type", "stage_changed")
+    
+    def dumps(self, records):
+        fields = self.FIELDS
+        rows = []
+        for record in records:
+            row = tuple(record.get(field) for field in fields)
+            extra = {key: value for key, value in record.items() if key not in fields}
+            rows.append(row + (extra or None,))
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, marshal.version)
+        return header + marshal.dumps(rows, marshal.version)
+    
+    def loads(self, raw):
+        magic, version, marshal_version = self.HEADER.unpack_from(raw, 0)
+        if magic != self.MAGIC:
+            raise ValueError("Arquivo não está no formato binário de leads")
+        if version != self.VERSION or marshal_version > marshal.version:
+            raise ValueError(f"Formato binário não suportado (versão {version}, marshal {marshal_version})")
+        fields = self.FIELDS
+        records = []
+        for row in marshal.loads(raw[self.HEADER.size:]):
+            record = {field: value for field, value in zip(fields, row) if value is not None}
+            if row[-1]:
+                record.update(row[-1])
+            records.append(record)
+        return records
+
+SERIALIZERS = {
+    serializer.name: serializer
+    for serializer in (JsonSerializer(), CompactJsonSerializer(), JsonLinesSerializer(), BinarySerializer())
+}
+
+def get_serializer(name):
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(f"Formato de serialização desconhecido: {name}")
+
+def detect_serializer(raw):
+    """Identifica o formato pelo conteúdo (cabeçalho binário, "[" ou "{")"""
+    if raw.startswith(BinarySerializer.MAGIC):
+        return SERIALIZERS["binary"]
+    stripped = raw.lstrip()
+    if stripped.startswith(b"{"):
+        return SERIALIZERS["jsonl"]
+    if stripped.startswith(b"[") and not stripped[1:2].isspace():
+        return SERIALIZERS["json-compact"]
+    return SERIALIZERS["json"]
+
+if __name__ == "__main__":
+    # Uso: python serializers.py <json|json-compact|jsonl|binary> [leads.json] [destino]
+    from storage import JsonFileStorage
+    target_format = sys.argv[1] if len(sys.argv) > 1 else "json"
+    source = Path(sys.argv[2]) if len(sys.argv) > 2 else Path(__file__).resolve().parent / "data" / "leads.json"
+    target = Path(sys.argv[3]) if len(sys.argv) > 3 else source
+    records = JsonFileStorage(source).load()
+    JsonFileStorage(target, serializer=target_format).save(records)
+    print(f"{len(records)} lead(s) convertido(s) para {target_format} em {target}")
\ No newline at end of file
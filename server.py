@@ -0,0 +1,252 @@
+# server.py
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+import argparse
+import hashlib
+import json
+from locking import ReadWriteLock
+from metrics import metrics
+
+class LeadRequestHandler(BaseHTTPRequestHandler):
+    """API JSON sobre LeadService
+    
+    GET  /leads?cursor=&limit=&stage=&qualified=   página de leads
+    GET  /leads/<email>                            lead pelo e-mail
+    GET  /search?q=&field=&limit=                  busca
+    GET  /top?k=                                   maiores scores
+    GET  /stats                                    contagens e funil
+    POST /leads                                    cria lead (JSON no corpo)
+    POST /leads/<email>/promote                    promove ({"score": 0-100})
+    POST /export                                   exporta CSV ({"compress": false})
+    """
+    
+    # HTTP/1.1: conexões keep-alive por padrão
+    protocol_version = "HTTP/1.1"
+    # Cabeçalhos e corpo saem em escritas separadas: sem TCP_NODELAY, o
+    # algoritmo de Nagle somado ao ACK atrasado custa ~40 ms por resposta
+    disable_nagle_algorithm = True
+    
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+    
+    # ---- Roteamento -----------------------------------------------------
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if parts == ["leads"]:
+            self._read(self._list_leads, query, cacheable=True)
+        elif len(parts) == 2 and parts[0] == "leads":
+            self._read(self._get_lead, parts[1], cacheable=True)
+        elif parts == ["search"]:
+            self._read(self._search, query, cacheable=True)
+        elif parts == ["top"]:
+            self._read(self._top, query, cacheable=True)
+        elif parts == ["stats"]:
+            self._read(self._stats, query, cacheable=True)
+        else:
+            self._send_json(404, {"error": "Rota não encontrada"})
+    
+    def do_POST(self):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        try:
+            body = self._read_body()
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        if parts == ["leads"]:
+            self._write(self._create_lead, body, status=201)
+        elif len(parts) == 3 and parts[0] == "leads" and parts[2] == "promote":
+            self._write(self._promote_lead, parts[1], body)
+        elif parts == ["export"]:
+            # Exportar só lê os leads: não bloqueia outras leituras
+            self._read(self._export, body)
+        else:
+            self._send_json(404, {"error": "Rota não encontrada"})
+    
+    # ---- Execução com o lock de leitura/escrita --------------------------
+    
+    def _read(self, handler, argument, cacheable=False):
+        with self.server.read_lock():
+            etag = self.server.etag(self.path) if cacheable else None
+            if etag is not None and etag in self.headers.get("If-None-Match", ""):
+                metrics.incr("http.not_modified")
+                self._send_empty(304, etag)
+                return
+            self._dispatch(handler, argument, etag=etag)
+    
+    def _write(self, handler, *arguments, status=200):
+        with self.server.lock.writing():
+            self.server.writes += 1
+            self._dispatch(handler, *arguments, status=status)
+    
+    def _dispatch(self, handler, *arguments, status=200, etag=None):
+        metrics.incr("http.requests")
+        try:
+            payload = handler(*arguments)
+        except LookupError as e:
+            self._send_json(404, {"error": str(e.args[0]) if e.args else "Não encontrado"})
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {"error": str(e)})
+        else:
+            self._send_json(status, payload, etag)
+    
+    # ---- Endpoints ------------------------------------------------------
+    
+    def _list_leads(self, query):
+        qualified = query.get("qualified")
+        page = self.server.service.list_page(
+            query.get("cursor"),
+            int(query.get("limit", 20)),
+            stage=query.get("stage"),
+            qualified=None if qualified is None else qualified.lower() in ("1", "true", "sim")
+        )
+        return {"items": [lead.to_dict() for lead in page["items"]], "next_cursor": page["next_cursor"]}
+    
+    def _get_lead(self, email):
+        lead = self.server.service.repository.get_by_email(email)
+        if lead is None:
+            raise LookupError("Lead não encontrado")
+        return lead.to_dict()
+    
+    def _search(self, query):
+        limit = query.get("limit")
+        results = self.server.service.search(
+            query.get("q", ""), field=query.get("field"), limit=int(limit) if limit else None
+        )
+        return {"items": [lead.to_dict() for lead in results]}
+    
+    def _top(self, query):
+        leads = self.server.service.top_leads(int(query.get("k", 50)))
+        return {"items": [lead.to_dict() for lead in leads]}
+    
+    def _stats(self, query):
+        return {"stats": self.server.service.get_stats(), "funnel": self.server.service.get_funnel()}
+    
+    def _create_lead(self, body):
+        lead = self.server.service.create_lead(
+            body.get("name", ""),
+            body.get("email", ""),
+            body.get("company", ""),
+            qualify=bool(body.get("qualify")),
+            score=int(body.get("score", 0))
+        )
+        return lead.to_dict()
+    
+    def _promote_lead(self, email, body):
+        if self.server.service.repository.get_by_email(email) is None:
+            raise LookupError("Lead não encontrado")
+        return self.server.service.promote_lead(email, int(body.get("score", 0))).to_dict()
+    
+    def _export(self, body):
+        report = self.server.service.export_leads(compress=bool(body.get("compress")))
+        if report is None:
+            raise ValueError("Não foi possível escrever o CSV")
+        report["files"] = [str(path) for path in report["files"]]
+        return report
+    
+    # ---- Entrada e saída ------------------------------------------------
+    
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length).decode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise ValueError("Corpo da requisição não é JSON válido")
+        if not isinstance(body, dict):
+            raise ValueError("Corpo da requisição deve ser um objeto JSON")
+        return body
+    
+    def _send_json(self, status, payload, etag=None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _send_empty(self, status, etag):
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+class LeadServer(ThreadingHTTPServer):
+    """Servidor HTTP com um LeadService compartilhado (dados em memória entre requisições)
+    
+    Leituras rodam em paralelo; gravações são serializadas pelo lock de
+    leitura/escrita. O ETag de cada resposta de leitura deriva da versão dos
+    dados: muda a cada gravação, deste ou de outro processo.
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, address, service, verbose=False):
+        super().__init__(address, LeadRequestHandler)
+        self.service = service
+        self.verbose = verbose
+        self.lock = ReadWriteLock()
+        self.writes = 0
+        # Uma conexão SQLite não aceita consultas simultâneas de várias
+        # threads: nesse motor as leituras também são exclusivas
+        self.shared_reads = hasattr(service.repository, "storage")
+    
+    def read_lock(self):
+        return self.lock.reading() if self.shared_reads else self.lock.writing()
+    
+    def data_version(self):
+        storage = getattr(self.service.repository, "storage", None)
+        if storage is not None:
+            return repr((self.writes, storage.signature()))
+        # SQLite: data_version muda quando outra conexão grava no banco
+        connection = self.service.repository.connection
+        return repr((self.writes, connection.total_changes,
+                     connection.execute("PRAGMA data_version").fetchone()[0]))
+    
+    def etag(self, path):
+        digest = hashlib.sha1(f"{self.data_version()}|{path}".encode("utf-8")).hexdigest()
+        return f'"{digest[:20]}"'
+
+def create_server(host="127.0.0.1", port=8000, service=None, verbose=False):
+    if service is None:
+        from service import lead_service as service
+    return LeadServer((host, port), service, verbose)
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP JSON do Mini CRM")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db", help="arquivo de dados (padrão: data/leads.json)")
+    parser.add_argument("--storage", choices=["json", "log", "partitioned", "sqlite"],
+                        default="json")
+    parser.add_argument("--verbose", action="store_true", help="registra cada requisição")
+    args = parser.parse_args()
+    
+    from service import LeadService
+    if args.storage == "sqlite":
+        from sqlite_repository import SQLiteLeadRepository
+        repository = SQLiteLeadRepository(args.db, check_same_thread=False)
+    else:
+        from repository import LeadRepository
+        repository = LeadRepository(args.db, storage=args.storage)
+    # Carrega os dados uma vez; as requisições seguintes usam o cache
+    repository.list_all()
+    
+    server = create_server(args.host, args.port, LeadService(repository), args.verbose)
+    print(f"Servindo em http://{args.host}:{server.server_address[1]} (Ctrl+C para sair)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,25 +1,34 @@
 # service.py
-from models import Lead, QualifiedLead
-from repository import lead_repository
+from datetime import date, datetime, timedelta
+from models import Lead, QualifiedLead, normalize_email
+from importers import read_rows
+from stages import StageManager
+from dedupe import find_duplicates
+from metrics import instrumented
+
+def _parse_date(value):
+    """date a partir de date/datetime ou texto AAAA-MM-DD"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f"Data inválida: {value} (use AAAA-MM-DD)")
 
 class LeadService:
     """Classe de serviço para operações de negócio com leads"""
     
     def __init__(self, repository=None):
-        self.repository = repository or lead_repository
+        if repository is None:
+            from repository import lead_repository as repository
+        self.repository = repository
     
+    @instrumented("service.create_lead")
     def create_lead(self, name, email, company="", qualify=False, score=0):
         """Factory method para criar leads (aplicando polimorfismo)"""
-        # Validações compatíveis com sistema existente
-        if not name or not name.strip():
-            raise ValueError("Nome é obrigatório")
-        if not email or "@" not in email:
-            raise ValueError("E-mail válido é obrigatório")
-        
-        # Verifica duplicata
-        existing_lead = self.repository.get_by_email(email)
-        if existing_lead:
-            raise ValueError(f"Lead com e-mail {email} já existe")
+        self._validate(name, email)
         
         # Cria o lead apropriado baseado no tipo
         if qualify:
@@ -27,65 +36,343 @@ class LeadService:
         else:
             lead = Lead(name.strip(), email.strip(), company.strip())
         
-        self.repository.add(lead)
+        # Checagem de duplicata e gravação sob o mesmo lock do repositório
+        if not self.repository.add_if_absent(lead):
+            raise ValueError(f"Lead com e-mail {email} já existe")
         return lead
     
+    def _validate(self, name, email):
+        """Validações compatíveis com sistema existente"""
+        if not name or not name.strip():
+            raise ValueError("Nome é obrigatório")
+        if not email or "@" not in email:
+            raise ValueError("E-mail válido é obrigatório")
+    
+    def _validate_created(self, created):
+        """created precisa começar por uma data AAAA-MM-DD válida
+        
+        Índice de datas, partições e coortes usam os 10 primeiros caracteres.
+        """
+        try:
+            day = date.fromisoformat(created[:10])
+            if day.isoformat() != created[:10]:
+                raise ValueError
+            if len(created) > 10:
+                datetime.fromisoformat(created)
+        except ValueError:
+            raise ValueError(f"Data de criação inválida: {created} (use AAAA-MM-DD)")
+    
+    def _lead_from_row(self, row):
+        """Cria Lead/QualifiedLead a partir de uma linha importada (layout do CSV)"""
+        if not isinstance(row, dict):
+            raise ValueError("Linha inválida")
+        
+        name = (row.get("name") or "").strip()
+        email = (row.get("email") or "").strip()
+        company = (row.get("company") or "").strip()
+        created = (row.get("created") or "").strip() or None
+        stage_changed = row.get("stage_changed") or None
+        self._validate(name, email)
+        if created is not None:
+            self._validate_created(created)
+        
+        if row.get("type") == "qualified":
+            score = row.get("score")
+            try:
+                score = int(score) if score not in (None, "") else 0
+            except (TypeError, ValueError):
+                raise ValueError(f"Score inválido: {score}")
+            return QualifiedLead(name, email, company, score, created,
+                                 row.get("stage") or "qualificado", stage_changed)
+        
+        return Lead(name, email, company, row.get("stage") or "novo", created, stage_changed)
+    
+    @instrumented("service.import_leads")
+    def import_leads(self, source, format=None, batch_size=1000):
+        """Importa leads em lote (CSV, JSON ou JSONL) com uma gravação por lote
+        
+        source: caminho, arquivo aberto ou iterável de dicionários.
+        A entrada é lida em streaming; a memória fica limitada ao tamanho do lote.
+        Retorna relatório com aceitos, rejeitados e o motivo de cada rejeição.
+        """
+        report = {"accepted": 0, "rejected": 0, "batches": 0, "errors": []}
+        # (linha, e-mail original, lead) do lote atual; e-mails já gravados são
+        # checados pelo repositório, sob o lock da gravação do lote
+        batch = []
+        seen = set()
+        
+        for number, row in read_rows(source, format):
+            email = row.get("email") if isinstance(row, dict) else None
+            try:
+                lead = self._lead_from_row(row)
+                key = normalize_email(lead.email)
+                if key in seen:
+                    raise ValueError(f"Lead com e-mail {lead.email} já existe")
+            except ValueError as e:
+                self._reject_import_row(report, number, email, e)
+                continue
+            
+            seen.add(key)
+            batch.append((number, email, lead))
+            if len(batch) >= batch_size:
+                self._flush_import_batch(batch, report)
+                batch = []
+                seen.clear()
+        
+        if batch:
+            self._flush_import_batch(batch, report)
+        # Rejeições por duplicata são conhecidas só no fim de cada lote
+        report["errors"].sort(key=lambda error: error["line"])
+        return report
+    
+    def _reject_import_row(self, report, number, email, error):
+        report["rejected"] += 1
+        report["errors"].append({"line": number, "email": email, "error": str(error)})
+    
+    def _flush_import_batch(self, batch, report):
+        rejected = {
+            normalize_email(email)
+            for email in self.repository.add_many_if_absent([lead for _, _, lead in batch])
+        }
+        for number, email, lead in batch:
+            if normalize_email(lead.email) in rejected:
+                self._reject_import_row(
+                    report, number, email, ValueError(f"Lead com e-mail {lead.email} já existe")
+                )
+        accepted = len(batch) - len(rejected)
+        if not accepted:
+            return
+        report["accepted"] += accepted
+        report["batches"] += 1
+    
+    @instrumented("service.list_all")
     def list_all(self):
         """Retorna todos os leads"""
         return self.repository.list_all()
     
+    @instrumented("service.list_page")
+    def list_page(self, cursor=None, limit=20, stage=None, qualified=None):
+        """Retorna uma página de leads ({"items", "next_cursor"})"""
+        return self.repository.list_page(cursor, limit, stage=stage, qualified=qualified)
+    
+    @instrumented("service.list_qualified")
     def list_qualified(self):
         """Retorna apenas leads qualificados"""
-        all_leads = self.repository.list_all()
-        return [lead for lead in all_leads if isinstance(lead, QualifiedLead)]
+        return self.repository.list_qualified()
+    
+    @instrumented("service.top_leads")
+    def top_leads(self, k=50):
+        """Os k leads qualificados de maior score"""
+        if k < 1:
+            raise ValueError("A quantidade deve ser positiva")
+        return self.repository.top_leads(k)
     
-    def search(self, query):
-        """Busca leads por termo"""
-        return self.repository.search(query)
+    @instrumented("service.leads_in_score_range")
+    def leads_in_score_range(self, low, high):
+        """Leads qualificados com score entre low e high (inclusive), maior score primeiro"""
+        if low > high:
+            raise ValueError("Score mínimo maior que o máximo")
+        return self.repository.leads_in_score_range(low, high)
     
+    @instrumented("service.leads_between")
+    def leads_between(self, start, end):
+        """Leads criados entre start e end (inclusive), em ordem de data de criação"""
+        start, end = _parse_date(start), _parse_date(end)
+        if start > end:
+            raise ValueError("Data inicial maior que a final")
+        return self.repository.leads_between(start.isoformat(), end.isoformat())
+    
+    @instrumented("service.weekly_cohorts")
+    def weekly_cohorts(self, start, end):
+        """Coortes semanais (segunda a domingo) dos leads criados entre start e end
+        
+        Para cada semana: leads criados, quantos foram qualificados e quantos
+        chegaram a "fechado". Só os leads do intervalo são lidos (índice de
+        datas); semanas nas bordas contam apenas os dias dentro do intervalo.
+        """
+        start, end = _parse_date(start), _parse_date(end)
+        if start > end:
+            raise ValueError("Data inicial maior que a final")
+        
+        cohorts = {}
+        week = start - timedelta(days=start.weekday())
+        while week <= end:
+            cohorts[week.isoformat()] = {
+                "week": week.isoformat(),
+                "week_end": (week + timedelta(days=6)).isoformat(),
+                "total": 0,
+                "qualified": 0,
+                "closed": 0
+            }
+            week += timedelta(days=7)
+        
+        for lead in self.repository.leads_between(start.isoformat(), end.isoformat()):
+            day = date.fromisoformat(lead.created[:10])
+            cohort = cohorts[(day - timedelta(days=day.weekday())).isoformat()]
+            cohort["total"] += 1
+            if isinstance(lead, QualifiedLead):
+                cohort["qualified"] += 1
+            if lead.stage == "fechado":
+                cohort["closed"] += 1
+        
+        for cohort in cohorts.values():
+            total = cohort["total"]
+            cohort["qualified_percent"] = cohort["qualified"] / total * 100 if total else 0.0
+            cohort["closed_percent"] = cohort["closed"] / total * 100 if total else 0.0
+        return list(cohorts.values())
+    
+    @instrumented("service.archive_partitions")
+    def archive_partitions(self, before):
+        """Compacta as partições de meses anteriores a before (AAAA-MM ou date)"""
+        if isinstance(before, date):
+            before = before.strftime("%Y-%m")
+        try:
+            before = datetime.strptime(str(before).strip(), "%Y-%m").strftime("%Y-%m")
+        except ValueError:
+            raise ValueError(f"Mês inválido: {before} (use AAAA-MM)")
+        if not hasattr(self.repository, "archive_partitions"):
+            raise ValueError("Arquivamento exige o motor partitioned")
+        return self.repository.archive_partitions(before)
+    
+    @instrumented("service.search")
+    def search(self, query, field=None, limit=None):
+        """Busca leads por termo, opcionalmente em um único campo e com limite"""
+        return self.repository.search(query, field=field, limit=limit)
+    
+    @instrumented("service.get_stats")
     def get_stats(self):
         """Retorna estatísticas dos leads"""
-        leads = self.repository.list_all()
-        total = len(leads)
-        qualified = len([lead for lead in leads if isinstance(lead, QualifiedLead)])
-        high_value = len([lead for lead in leads 
-                         if isinstance(lead, QualifiedLead) and lead.is_high_value()])
-        
-        return {
-            "total": total,
-            "qualified": qualified,
-            "high_value": high_value,
-            "regular": total - qualified
-        }
+        return self.repository.get_stats()
+    
+    @instrumented("service.get_funnel")
+    def get_funnel(self):
+        """Funil de vendas: quantidade e percentual de leads em cada estágio"""
+        counts = self.repository.stage_counts()
+        total = sum(counts.values())
+        stages = StageManager.get_available_stages()
+        # Estágios fora de STAGES (dados antigos) aparecem ao final
+        stages += sorted(stage for stage in counts if stage not in stages)
+        
+        return [
+            {
+                "stage": stage,
+                "name": StageManager.get_stage_display_name(stage),
+                "count": counts.get(stage, 0),
+                "percent": (counts.get(stage, 0) / total) * 100 if total else 0.0
+            }
+            for stage in stages
+        ]
     
+    @instrumented("service.promote_lead")
     def promote_lead(self, email, score=0):
         """Promove um lead regular para qualificado"""
-        lead = self.repository.get_by_email(email)
+        # Leitura e gravação sob o mesmo lock do repositório: uma mudança de
+        # estágio feita por outro processo no meio não é sobrescrita
+        promoted = self.repository.transition_many(
+            [email], lambda leads: [self._promoted_lead(leads[0], score)]
+        )
+        return promoted[0]
+    
+    def _promoted_lead(self, lead, score):
+        """Versão qualificada de um lead regular (mesmo e-mail)"""
         if not lead:
             raise ValueError("Lead não encontrado")
         
         if isinstance(lead, QualifiedLead):
             raise ValueError("Lead já é qualificado")
         
-        # Remove lead regular e adiciona como qualificado
-        leads = self.repository.list_all()
-        leads = [l for l in leads if l.email != email]
+        # Lead já adiante no funil (ex.: proposta) não volta para "qualificado"
+        stages = StageManager.get_available_stages()
+        if lead.stage in stages and stages.index(lead.stage) > stages.index("qualificado"):
+            stage, stage_changed = lead.stage, lead.stage_changed
+        else:
+            stage, stage_changed = "qualificado", datetime.now().isoformat(timespec="seconds")
         
-        qualified_lead = QualifiedLead(
+        # Substitui o lead regular pelo qualificado (mesmo e-mail)
+        return QualifiedLead(
             name=lead.name,
             email=lead.email,
             company=lead.company,
             score=score,
-            created=lead.created
+            created=lead.created,
+            stage=stage,
+            stage_changed=stage_changed
         )
+    
+    @instrumented("service.transition_leads")
+    def transition_leads(self, emails, target, from_stage=None):
+        """Move um lote de leads para o estágio target com uma única gravação
+        
+        from_stage: exige que cada lead esteja nesse estágio (ex.: contatado -> proposta).
+        Leads inexistentes ou com transição inválida são rejeitados sem
+        interromper o lote. Retorna relatório com movidos, rejeitados e motivos.
+        """
+        if target not in StageManager.get_available_stages():
+            raise ValueError(f"Estágio inválido: {target}")
+        
+        report = {"moved": 0, "rejected": 0, "errors": []}
+        changed_at = datetime.now().isoformat(timespec="seconds")
+        emails = list(emails)
         
-        leads.append(qualified_lead)
-        self.repository._save_leads(leads)
-        return qualified_lead
+        def transition(leads):
+            moved = {}
+            for email, lead in zip(emails, leads):
+                try:
+                    if lead is None:
+                        raise ValueError("Lead não encontrado")
+                    key = normalize_email(lead.email)
+                    if key in moved:
+                        raise ValueError("E-mail repetido no lote")
+                    StageManager.validate_transition(lead, target, from_stage)
+                except ValueError as e:
+                    report["rejected"] += 1
+                    report["errors"].append({"email": email, "error": str(e)})
+                    continue
+                moved[key] = StageManager.moved_lead(lead, target, changed_at)
+            return list(moved.values())
+        
+        # Leitura, validação e gravação sob o mesmo lock do repositório: uma
+        # promoção feita por outro processo no meio não é sobrescrita
+        report["moved"] = len(self.repository.transition_many(emails, transition))
+        return report
+    
+    @instrumented("service.find_duplicates")
+    def find_duplicates(self):
+        """Relatório de prováveis duplicatas (e-mail, domínio + nome, empresa + nome)"""
+        return find_duplicates(self.repository.list_all())
+    
+    @instrumented("service.merge_duplicates")
+    def merge_duplicates(self, report=None):
+        """Remove as duplicatas de cada grupo, mantendo o QualifiedLead de maior score
+        
+        report: relatório de find_duplicates (recalculado se None).
+        Retorna o relatório com "removed" (quantidade de leads removidos).
+        """
+        report = report or self.find_duplicates()
+        emails = [email for group in report["groups"] for email in group["duplicates"]]
+        # Cópias com o mesmo e-mail do lead mantido só existem em arquivos
+        # antigos; remover pela chave apagaria também o lead mantido
+        keep = {normalize_email(group["survivor"]) for group in report["groups"]}
+        emails = [email for email in emails if normalize_email(email) not in keep]
+        removed = self.repository.remove_many(emails)
+        report["removed"] = len(removed)
+        return report
     
     def export_to_csv(self):
         """Exporta leads para CSV"""
         return self.repository.export_csv()
+    
+    @instrumented("service.export_leads")
+    def export_leads(self, path=None, compress=False, rows_per_file=None, partition_by=None):
+        """Exporta leads para CSV em streaming e retorna relatório de vazão"""
+        return self.repository.export(
+            path, compress=compress, rows_per_file=rows_per_file, partition_by=partition_by
+        )
 
-# Instância global do serviço
-lead_service = LeadService()
\ No newline at end of file
+def __getattr__(name):
+    """Instância global do serviço, criada no primeiro acesso"""
+    if name == "lead_service":
+        global lead_service
+        lead_service = LeadService()
+        return lead_service
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
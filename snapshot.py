@@ -0,0 +1,167 @@
+# snapshot.py
+from array import array
+from pathlib import Path
+import json
+import mmap
+import struct
+import sys
+import zlib
+from models import lead_from_dict, normalize_email
+from storage import record_key, temp_path_for
+from metrics import instrumented, metrics
+
+# Layout (little-endian):
+#   cabeçalho | metadados JSON | registros JSON (um após o outro)
+#   | índice de offsets (count + 1 inteiros de 8 bytes)
+#   | tabela hash de e-mails (slots de 8 bytes: hash de 32 bits, posição + 1)
+MAGIC = b"CRMSNAP\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQQQ")
+OFFSET = struct.Struct("<Q")
+SLOT = struct.Struct("<II")
+
+def email_hash(key):
+    """Hash estável entre processos (hash() do Python muda a cada execução)"""
+    return zlib.crc32(key.encode("utf-8"))
+
+def _slot_count(count):
+    """Potência de 2 com ocupação de no máximo 50%"""
+    slots = 8
+    while slots < count * 2:
+        slots *= 2
+    return slots
+
+def _little_endian(values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+@instrumented("snapshot.write")
+def write_snapshot(path, records, meta=None):
+    """Grava um snapshot somente leitura de forma atômica; retorna a quantidade de registros"""
+    path = Path(path)
+    meta_bytes = json.dumps(meta or {}, ensure_ascii=False).encode("utf-8")
+    offsets = array("Q")
+    hashes = array("I")
+    tmp_path = temp_path_for(path)
+    try:
+        with tmp_path.open("wb") as f:
+            f.write(b"\0" * HEADER.size)
+            f.write(meta_bytes)
+            position = HEADER.size + len(meta_bytes)
+            for record in records:
+                data = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                offsets.append(position)
+                hashes.append(email_hash(record_key(record)))
+                f.write(data)
+                position += len(data)
+            offsets.append(position)
+            count = len(hashes)
+            
+            index_offset = position
+            f.write(_little_endian(offsets))
+            
+            hash_offset = f.tell()
+            slots = _slot_count(count)
+            # Pares (hash, posição + 1) lado a lado; posição 0 marca slot vazio
+            table = array("I", [0]) * (slots * 2)
+            mask = slots - 1
+            for i, value in enumerate(hashes):
+                slot = value & mask
+                while table[slot * 2 + 1]:
+                    slot = (slot + 1) & mask
+                table[slot * 2] = value
+                table[slot * 2 + 1] = i + 1
+            f.write(_little_endian(table))
+            
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, 0, count, len(meta_bytes),
+                                index_offset, hash_offset, slots))
+            metrics.incr("storage.bytes_written", hash_offset + slots * SLOT.size)
+        tmp_path.replace(path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return count
+
+class SnapshotReader:
+    """Leitor somente leitura de um snapshot via mmap
+    
+    Abrir custa só a leitura do cabeçalho; cada acesso decodifica apenas o
+    registro tocado. Processos que abrem o mesmo arquivo compartilham o
+    cache de páginas do sistema operacional.
+    """
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, _, self._count, meta_length,
+             self._index_offset, self._hash_offset, self._slots) = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} não é um snapshot de leads")
+            if version != VERSION:
+                raise ValueError(f"Versão de snapshot não suportada: {version}")
+            self.meta = json.loads(self._mmap[HEADER.size:HEADER.size + meta_length])
+        except Exception:
+            self._mmap.close()
+            raise
+    
+    def close(self):
+        self._mmap.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def __len__(self):
+        return self._count
+    
+    def record(self, position):
+        """Dicionário do registro na posição (só este registro é decodificado)"""
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError("Posição fora do snapshot")
+        start = self._index_offset + position * OFFSET.size
+        begin, = OFFSET.unpack_from(self._mmap, start)
+        end, = OFFSET.unpack_from(self._mmap, start + OFFSET.size)
+        return json.loads(self._mmap[begin:end])
+    
+    def __getitem__(self, position):
+        return lead_from_dict(self.record(position))
+    
+    def __iter__(self):
+        for position in range(self._count):
+            yield self[position]
+    
+    def position_of(self, email):
+        """Posição do lead com o e-mail ou None (tabela hash, sem varrer o arquivo)"""
+        key = normalize_email(email)
+        value = email_hash(key)
+        mask = self._slots - 1
+        slot = value & mask
+        while True:
+            stored, position = SLOT.unpack_from(self._mmap, self._hash_offset + slot * SLOT.size)
+            if not position:
+                return None
+            if stored == value and record_key(self.record(position - 1)) == key:
+                return position - 1
+            slot = (slot + 1) & mask
+    
+    @instrumented("snapshot.get_by_email")
+    def get_by_email(self, email):
+        position = self.position_of(email)
+        return self[position] if position is not None else None
+
+if __name__ == "__main__":
+    # Uso: python snapshot.py [leads.json] [leads.snap]
+    from repository import LeadRepository
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else None
+    repository = LeadRepository(source)
+    target = repository.write_snapshot(sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Snapshot gravado em {target}")
\ No newline at end of file
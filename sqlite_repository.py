@@ -0,0 +1,401 @@
+# sqlite_repository.py
+from datetime import date, timedelta
+from pathlib import Path
+import sqlite3
+import sys
+from models import Lead, QualifiedLead, HIGH_VALUE_SCORE, normalize_email
+from storage import JsonFileStorage
+from indexes import SEARCH_FIELDS
+from exporters import CsvExporter
+from metrics import instrumented
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id        INTEGER PRIMARY KEY,
+    email_key TEXT NOT NULL UNIQUE,
+    name      TEXT NOT NULL,
+    company   TEXT NOT NULL DEFAULT '',
+    email     TEXT NOT NULL,
+    stage     TEXT NOT NULL,
+    created   TEXT,
+    score     INTEGER,
+    type      TEXT,
+    stage_changed TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_leads_stage ON leads (stage);
+CREATE INDEX IF NOT EXISTS idx_leads_score ON leads (type, score);
+CREATE INDEX IF NOT EXISTS idx_leads_created ON leads (created);
+"""
+
+# Colunas na ordem de Lead.to_dict(); o e-mail normalizado (email_key)
+# tem índice UNIQUE e atende get_by_email e a checagem de duplicatas
+COLUMNS = "name, company, email, stage, created, score, type, stage_changed"
+# Um "?" para email_key e um para cada coluna
+PLACEHOLDERS = ", ".join("?" * (len(COLUMNS.split(",")) + 1))
+
+class SQLiteLeadRepository:
+    """Repositório de leads em SQLite (WAL) com a mesma interface de LeadRepository"""
+    
+    def __init__(self, db_path=None, check_same_thread=True):
+        self.DATA_DIR = Path(__file__).resolve().parent / "data"
+        # data/ só é criado quando um caminho padrão é usado
+        if db_path is None:
+            self.DATA_DIR.mkdir(exist_ok=True)
+        self.DB_PATH = Path(db_path) if db_path else (self.DATA_DIR / "leads.db")
+        # As consultas são parametrizadas: o sqlite3 mantém os statements
+        # preparados em cache e os reutiliza a cada chamada
+        # check_same_thread=False permite usar a conexão a partir de outras
+        # threads (ex.: server.py), desde que o chamador serialize o acesso
+        self.connection = sqlite3.connect(
+            self.DB_PATH, cached_statements=256, check_same_thread=check_same_thread
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        # lower() nativo do SQLite só trata ASCII; a busca usa o do Python
+        self.connection.create_function("py_lower", 1, str.lower, deterministic=True)
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+    
+    def _migrate(self):
+        """Bancos criados antes da coluna stage_changed ganham a coluna vazia"""
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(leads)")}
+        if "stage_changed" not in columns:
+            with self.connection:
+                self.connection.execute("ALTER TABLE leads ADD COLUMN stage_changed TEXT")
+    
+    def close(self):
+        self.connection.close()
+    
+    def _row_to_lead(self, row):
+        """Converte uma linha (na ordem de COLUMNS) em Lead/QualifiedLead"""
+        name, company, email, stage, created, score, lead_type, stage_changed = row
+        if lead_type == "qualified":
+            return QualifiedLead(name, email, company, score or 0, created, stage, stage_changed)
+        return Lead(name, email, company, stage, created, stage_changed)
+    
+    def _lead_params(self, lead):
+        data = lead.to_dict()
+        return (
+            normalize_email(data["email"]), data["name"], data["company"],
+            data["email"], data["stage"], data["created"],
+            data.get("score"), data.get("type"), data.get("stage_changed")
+        )
+    
+    def _query(self, sql, params=()):
+        return [self._row_to_lead(row) for row in self.connection.execute(sql, params)]
+    
+    def _insert(self, leads):
+        self.connection.executemany(
+            f"INSERT INTO leads (email_key, {COLUMNS}) VALUES ({PLACEHOLDERS})",
+            (self._lead_params(lead) for lead in leads)
+        )
+    
+    @instrumented("sqlite.save_leads")
+    def _save_leads(self, leads):
+        """Substitui todo o conteúdo em uma única transação"""
+        with self.connection:
+            self.connection.execute("DELETE FROM leads")
+            self._insert(leads)
+    
+    @instrumented("sqlite.list_all")
+    def list_all(self):
+        """Retorna todos os leads"""
+        return self._query(f"SELECT {COLUMNS} FROM leads ORDER BY id")
+    
+    def add(self, lead):
+        """Adiciona um novo lead (polimorfismo na aceitação)"""
+        self.add_many([lead])
+        return lead
+    
+    @instrumented("sqlite.list_page")
+    def list_page(self, cursor=None, limit=20, stage=None, qualified=None):
+        """Página de leads por keyset (id > cursor), usando os índices de stage/type"""
+        try:
+            last_id = int(cursor) if cursor is not None else 0
+        except (TypeError, ValueError):
+            raise ValueError(f"Cursor inválido: {cursor}")
+        if limit < 1:
+            raise ValueError("limit deve ser positivo")
+        
+        conditions, params = ["id > ?"], [last_id]
+        if stage is not None:
+            conditions.append("stage = ?")
+            params.append(stage)
+        if qualified is not None:
+            conditions.append("type = 'qualified'" if qualified else "type IS NOT 'qualified'")
+        params.append(limit + 1)
+        
+        rows = self.connection.execute(
+            f"SELECT id, {COLUMNS} FROM leads WHERE {' AND '.join(conditions)} "
+            "ORDER BY id LIMIT ?",
+            params
+        ).fetchall()
+        items = [self._row_to_lead(row[1:]) for row in rows[:limit]]
+        next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+    
+    @instrumented("sqlite.add_many")
+    def add_many(self, leads):
+        """Adiciona vários leads em uma única transação"""
+        leads = list(leads)
+        for lead in leads:
+            if not isinstance(lead, (Lead, QualifiedLead)):
+                raise TypeError("Objeto deve ser do tipo Lead ou QualifiedLead")
+        
+        with self.connection:
+            self._insert(leads)
+        return leads
+    
+    def add_if_absent(self, lead):
+        """Adiciona o lead só se o e-mail ainda não existir; retorna False se existir"""
+        return not self.add_many_if_absent([lead])
+    
+    @instrumented("sqlite.add_many_if_absent")
+    def add_many_if_absent(self, leads):
+        """Adiciona só os leads cujo e-mail ainda não existe; retorna os e-mails recusados
+        
+        INSERT OR IGNORE no índice UNIQUE em email_key, em uma única transação.
+        """
+        leads = list(leads)
+        for lead in leads:
+            if not isinstance(lead, (Lead, QualifiedLead)):
+                raise TypeError("Objeto deve ser do tipo Lead ou QualifiedLead")
+        
+        rejected = []
+        with self.connection:
+            for lead in leads:
+                cursor = self.connection.execute(
+                    f"INSERT OR IGNORE INTO leads (email_key, {COLUMNS}) VALUES ({PLACEHOLDERS})",
+                    self._lead_params(lead)
+                )
+                if cursor.rowcount == 0:
+                    rejected.append(lead.email)
+        return rejected
+    
+    @instrumented("sqlite.update")
+    def update(self, lead):
+        """Substitui o lead de mesmo e-mail com um único UPDATE indexado"""
+        self.update_many([lead])
+        return lead
+    
+    @instrumented("sqlite.update_many")
+    def update_many(self, leads):
+        """Substitui vários leads (pelo e-mail) em uma única transação"""
+        leads = list(leads)
+        with self.connection:
+            self._update(leads)
+        return leads
+    
+    @instrumented("sqlite.transition_many")
+    def transition_many(self, emails, transition):
+        """Lê, altera e grava leads em uma única transação
+        
+        transition recebe os leads atuais (ou None) na ordem de emails e
+        retorna as novas versões a gravar. BEGIN IMMEDIATE reserva a escrita
+        antes da leitura: outra conexão não grava esses leads no meio.
+        """
+        emails = list(emails)
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            leads = list(transition(self.get_many_by_email(emails)))
+            self._update(leads)
+        return leads
+    
+    def _update(self, leads):
+        for lead in leads:
+            if not isinstance(lead, (Lead, QualifiedLead)):
+                raise TypeError("Objeto deve ser do tipo Lead ou QualifiedLead")
+        for lead in leads:
+            key, *values = self._lead_params(lead)
+            cursor = self.connection.execute(
+                "UPDATE leads SET name = ?, company = ?, email = ?, stage = ?, "
+                "created = ?, score = ?, type = ?, stage_changed = ? WHERE email_key = ?",
+                (*values, key)
+            )
+            if cursor.rowcount == 0:
+                self._insert([lead])
+    
+    @instrumented("sqlite.remove_many")
+    def remove_many(self, emails):
+        """Remove os leads com os e-mails informados em uma única transação"""
+        removed = [lead for lead in self.get_many_by_email(emails) if lead is not None]
+        keys = [normalize_email(lead.email) for lead in removed]
+        with self.connection:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                self.connection.execute(
+                    f"DELETE FROM leads WHERE email_key IN ({', '.join('?' * len(chunk))})", chunk
+                )
+        return removed
+    
+    @instrumented("sqlite.search")
+    def search(self, query, field=None, limit=None):
+        """Busca leads por termo (nome, empresa ou email) - mesma semântica do JSON"""
+        if not query:
+            return []
+        if field is not None and field not in SEARCH_FIELDS:
+            raise ValueError(f"Campo de busca inválido: {field}")
+        
+        text = field if field else "name || ' ' || company || ' ' || email"
+        return self._query(
+            f"SELECT {COLUMNS} FROM leads WHERE instr(py_lower({text}), ?) > 0 "
+            "ORDER BY id LIMIT ?",
+            (query.lower(), -1 if limit is None else limit)
+        )
+    
+    @instrumented("sqlite.get_by_email")
+    def get_by_email(self, email):
+        """Busca lead específico por e-mail (índice UNIQUE em email_key)"""
+        leads = self._query(
+            f"SELECT {COLUMNS} FROM leads WHERE email_key = ?", (normalize_email(email),)
+        )
+        return leads[0] if leads else None
+    
+    @instrumented("sqlite.get_many_by_email")
+    def get_many_by_email(self, emails):
+        """Leads (ou None) para cada e-mail, na mesma ordem, em consultas IN por blocos"""
+        keys = [normalize_email(email) for email in emails]
+        found = {}
+        # Abaixo do limite de parâmetros por consulta do SQLite
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self.connection.execute(
+                f"SELECT email_key, {COLUMNS} FROM leads "
+                f"WHERE email_key IN ({', '.join('?' * len(chunk))})",
+                chunk
+            )
+            for row in rows:
+                found[row[0]] = self._row_to_lead(row[1:])
+        return [found.get(key) for key in keys]
+    
+    def export_csv(self, path=None):
+        """Exporta leads para CSV - mantém funcionalidade existente"""
+        report = self.export(path)
+        return report["files"][0] if report else None
+    
+    @instrumented("sqlite.export")
+    def export(self, path=None, compress=False, rows_per_file=None, partition_by=None):
+        """Exporta em streaming direto do cursor (gzip e divisão opcionais)"""
+        if not path:
+            self.DATA_DIR.mkdir(exist_ok=True)
+        path = Path(path) if path else (self.DATA_DIR / "leads.csv")
+        exporter = CsvExporter(
+            path,
+            include_qualified=self.has_qualified(),
+            compress=compress,
+            rows_per_file=rows_per_file,
+            partition_by=partition_by
+        )
+        cursor = self.connection.execute(f"SELECT {COLUMNS} FROM leads ORDER BY id")
+        
+        try:
+            return exporter.write(self._row_to_lead(row).to_dict() for row in cursor)
+        except PermissionError:
+            return None
+    
+    def has_qualified(self):
+        """Indica se há leads qualificados (consulta no índice type, score)"""
+        return bool(self.connection.execute(
+            "SELECT EXISTS (SELECT 1 FROM leads WHERE type = 'qualified')"
+        ).fetchone()[0])
+    
+    @instrumented("sqlite.count")
+    def count(self):
+        """Retorna quantidade total de leads"""
+        return self.connection.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+    
+    @instrumented("sqlite.list_qualified")
+    def list_qualified(self):
+        """Retorna apenas leads qualificados (índice em type, score)"""
+        return self._query(
+            f"SELECT {COLUMNS} FROM leads WHERE type = 'qualified' ORDER BY id"
+        )
+    
+    @instrumented("sqlite.top_leads")
+    def top_leads(self, k):
+        """Os k leads qualificados de maior score (índice em type, score)"""
+        if k < 1:
+            return []
+        return self._query(
+            f"SELECT {COLUMNS} FROM leads WHERE type = 'qualified' "
+            "ORDER BY score DESC, id LIMIT ?",
+            (k,)
+        )
+    
+    @instrumented("sqlite.leads_in_score_range")
+    def leads_in_score_range(self, low, high):
+        """Leads qualificados com low <= score <= high (índice em type, score)"""
+        return self._query(
+            f"SELECT {COLUMNS} FROM leads WHERE type = 'qualified' "
+            "AND score BETWEEN ? AND ? ORDER BY score DESC, id",
+            (low, high)
+        )
+    
+    @instrumented("sqlite.leads_between")
+    def leads_between(self, start, end):
+        """Leads criados entre start e end (datas ISO, inclusive; índice em created)"""
+        # created pode trazer hora: o limite superior é o início do dia seguinte
+        after_end = (date.fromisoformat(end) + timedelta(days=1)).isoformat()
+        return self._query(
+            f"SELECT {COLUMNS} FROM leads WHERE created >= ? AND created < ? "
+            "ORDER BY substr(created, 1, 10), id",
+            (start, after_end)
+        )
+    
+    @instrumented("sqlite.get_stats")
+    def get_stats(self):
+        """Retorna contagens de leads em uma única consulta"""
+        total, qualified, high_value = self.connection.execute(
+            "SELECT COUNT(*), "
+            "COALESCE(SUM(type = 'qualified'), 0), "
+            "COALESCE(SUM(type = 'qualified' AND score >= ?), 0) FROM leads",
+            (HIGH_VALUE_SCORE,)
+        ).fetchone()
+        
+        return {
+            "total": total,
+            "qualified": qualified,
+            "high_value": high_value,
+            "regular": total - qualified
+        }
+    
+    @instrumented("sqlite.stage_counts")
+    def stage_counts(self):
+        """Quantidade de leads por estágio (índice em stage)"""
+        return dict(self.connection.execute(
+            "SELECT stage, COUNT(*) FROM leads GROUP BY stage"
+        ).fetchall())
+    
+    @instrumented("sqlite.daily_counts")
+    def daily_counts(self):
+        """Quantidade de leads por dia de criação (índice em created)"""
+        return dict(self.connection.execute(
+            "SELECT COALESCE(substr(created, 1, 10), ''), COUNT(*) FROM leads "
+            "GROUP BY substr(created, 1, 10)"
+        ).fetchall())
+    
+    @instrumented("sqlite.import_json")
+    def import_json(self, json_path):
+        """Importa um leads.json (array) existente; e-mails já presentes são ignorados"""
+        records = JsonFileStorage(json_path).load()
+        before = self.count()
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT OR IGNORE INTO leads (email_key, {COLUMNS}) VALUES ({PLACEHOLDERS})",
+                (
+                    self._lead_params(
+                        QualifiedLead.from_dict(data) if data.get("type") == "qualified"
+                        else Lead.from_dict(data)
+                    )
+                    for data in records
+                )
+            )
+        return self.count() - before
+
+if __name__ == "__main__":
+    # Uso: python sqlite_repository.py [leads.json] [leads.db]
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).resolve().parent / "data" / "leads.json"
+    repository = SQLiteLeadRepository(sys.argv[2] if len(sys.argv) > 2 else None)
+    imported = repository.import_json(source)
+    print(f"{imported} lead(s) importado(s) de {source} para {repository.DB_PATH}")
+    repository.close()
\ No newline at end of file
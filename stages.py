@@ -25,6 +25,36 @@ class StageManager:
         }
         return stage_names.get(stage, stage)
     
+    @classmethod
+    def can_transition(cls, current, target):
+        """Movimentos válidos seguem a ordem de STAGES, sempre para frente
+        
+        "qualificado" exige score: um lead só chega lá pela promoção.
+        """
+        if current not in STAGES or target not in STAGES or target == "qualificado":
+            return False
+        return STAGES.index(target) > STAGES.index(current)
+    
+    @classmethod
+    def validate_transition(cls, lead, target, from_stage=None):
+        """Lança ValueError explicando por que o lead não pode ir para target"""
+        if target not in STAGES:
+            raise ValueError(f"Estágio inválido: {target}")
+        if from_stage is not None and lead.stage != from_stage:
+            raise ValueError(f"Lead está em {lead.stage}, não em {from_stage}")
+        if target == "qualificado":
+            raise ValueError("Use a promoção para qualificar um lead")
+        if not cls.can_transition(lead.stage, target):
+            raise ValueError(f"Transição inválida: {lead.stage} -> {target}")
+    
+    @classmethod
+    def moved_lead(cls, lead, target, changed_at):
+        """Cópia do lead no novo estágio; o objeto original (em cache) não é alterado"""
+        moved = type(lead).from_dict(lead.to_dict())
+        moved.stage = target
+        moved.stage_changed = changed_at
+        return moved
+    
     @classmethod
     def create_lead_object(cls, name, email, company=""):
         """Factory method para criar objeto Lead"""
@@ -0,0 +1,133 @@
+# stats.py
+from collections import Counter
+import json
+from models import QualifiedLead
+from indexes import created_day
+from storage import atomic_write_text
+
+class LeadStats:
+    """Contadores de leads mantidos incrementalmente a cada gravação
+    
+    total, qualificados, high-value, por estágio e por dia de criação.
+    """
+    
+    def __init__(self):
+        self.total = 0
+        self.qualified = 0
+        self.high_value = 0
+        self.by_stage = Counter()
+        self.by_day = Counter()
+    
+    @classmethod
+    def from_leads(cls, leads):
+        """Reconstrói os contadores com uma varredura completa"""
+        stats = cls()
+        for lead in leads:
+            stats.add(lead)
+        return stats
+    
+    def _apply(self, lead, delta):
+        self.total += delta
+        if isinstance(lead, QualifiedLead):
+            self.qualified += delta
+            if lead.is_high_value():
+                self.high_value += delta
+        # Só a data: created pode trazer hora (importação de datetimes)
+        day = created_day(lead)
+        self.by_stage[lead.stage] += delta
+        self.by_day[day] += delta
+        # Remove chaves zeradas para a comparação em verify() ser exata
+        for counter, key in ((self.by_stage, lead.stage), (self.by_day, day)):
+            if counter[key] == 0:
+                del counter[key]
+    
+    def add(self, lead):
+        self._apply(lead, 1)
+    
+    def remove(self, lead):
+        self._apply(lead, -1)
+    
+    def replace(self, old_lead, new_lead):
+        """Atualização de um lead (promoção, mudança de estágio)"""
+        self.remove(old_lead)
+        self.add(new_lead)
+    
+    def merge(self, other):
+        """Soma os contadores de outra instância (ex.: de uma varredura em partes)"""
+        self.total += other.total
+        self.qualified += other.qualified
+        self.high_value += other.high_value
+        self.by_stage.update(other.by_stage)
+        self.by_day.update(other.by_day)
+        return self
+    
+    def as_dict(self):
+        """Formato retornado por get_stats()"""
+        return {
+            "total": self.total,
+            "qualified": self.qualified,
+            "high_value": self.high_value,
+            "regular": self.total - self.qualified
+        }
+    
+    def to_json(self):
+        data = self.as_dict()
+        data["by_stage"] = dict(self.by_stage)
+        data["by_day"] = dict(self.by_day)
+        return data
+    
+    @classmethod
+    def from_json(cls, data):
+        stats = cls()
+        stats.total = data["total"]
+        stats.qualified = data["qualified"]
+        stats.high_value = data["high_value"]
+        stats.by_stage = Counter(data["by_stage"])
+        stats.by_day = Counter(data["by_day"])
+        return stats
+    
+    def __eq__(self, other):
+        if not isinstance(other, LeadStats):
+            return NotImplemented
+        return self.to_json() == other.to_json()
+    
+    def differences(self, other):
+        """Lista os contadores que divergem entre duas instâncias"""
+        mine, theirs = self.to_json(), other.to_json()
+        return [key for key in mine if mine[key] != theirs[key]]
+
+class StatsFile:
+    """Persiste os contadores ao lado dos dados, junto com a assinatura dos arquivos
+    
+    Os contadores só são aproveitados se a assinatura gravada for a mesma
+    do armazenamento atual; caso contrário são reconstruídos.
+    """
+    
+    # 2: by_day agrupado pelo dia (AAAA-MM-DD), não pelo created inteiro
+    VERSION = 2
+    
+    def __init__(self, path):
+        self.path = path
+    
+    def load(self, signature):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if data.get("version") != self.VERSION:
+            return None
+        if data.get("signature") != json.loads(json.dumps(signature)):
+            return None
+        return LeadStats.from_json(data["stats"])
+    
+    def save(self, stats, signature):
+        atomic_write_text(
+            self.path,
+            json.dumps(
+                {"version": self.VERSION, "signature": signature, "stats": stats.to_json()},
+                ensure_ascii=False
+            ),
+            # Sem fsync: se o arquivo se perder, a assinatura não confere e
+            # os contadores são reconstruídos a partir dos dados
+            fsync=False
+        )
\ No newline at end of file
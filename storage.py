@@ -0,0 +1,603 @@
+# storage.py
+from collections import Counter
+from pathlib import Path
+import gzip
+import json
+import os
+import threading
+from models import normalize_email
+from metrics import instrumented, metrics
+from serializers import get_serializer, detect_serializer
+
+def file_signature(path):
+    """Identidade barata de um arquivo (mtime, tamanho, inode) para detectar alterações"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def temp_path_for(path):
+    """Arquivo temporário exclusivo deste processo/thread, no mesmo diretório do destino"""
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+def atomic_write_text(path, text, fsync=True):
+    """Grava via arquivo temporário + rename: leitores veem o conteúdo antigo ou o novo inteiro"""
+    atomic_write_bytes(path, text.encode("utf-8"), fsync)
+
+def atomic_write_bytes(path, data, fsync=True):
+    path = Path(path)
+    tmp_path = temp_path_for(path)
+    metrics.incr("storage.bytes_written", len(data))
+    try:
+        with tmp_path.open("wb") as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+def record_key(data):
+    """Chave de identidade de um registro (e-mail normalizado)"""
+    return normalize_email(data["email"])
+
+class JsonFileStorage:
+    """Motor de armazenamento original: um único arquivo reescrito a cada gravação
+    
+    O formato (serializers.py) é detectado pelo conteúdo na leitura. Sem
+    `serializer`, as gravações mantêm o formato atual do arquivo (array JSON
+    indentado para arquivos novos); com ele, a próxima gravação converte.
+    """
+    
+    def __init__(self, path, serializer=None):
+        self.path = Path(path)
+        self.serializer = get_serializer(serializer) if serializer else None
+        self._detected = None
+    
+    def signature(self):
+        """Muda sempre que o arquivo é modificado (por este ou outro processo)"""
+        return file_signature(self.path)
+    
+    @instrumented("storage.json.load")
+    def load(self):
+        """Retorna a lista de registros (dicionários) na ordem do arquivo"""
+        if not self.path.exists():
+            return []
+        raw = self.path.read_bytes()
+        metrics.incr("storage.bytes_read", len(raw))
+        self._detected = detect_serializer(raw)
+        return self._detected.loads(raw)
+    
+    @instrumented("storage.json.save")
+    def save(self, records):
+        """Reescreve o arquivo inteiro (de forma atômica) com os registros informados"""
+        serializer = self.serializer or self._detected or get_serializer("json")
+        atomic_write_bytes(self.path, serializer.dumps(records))
+    
+    @instrumented("storage.json.append")
+    def append(self, records):
+        """Adiciona registros ao final (exige reescrita completa neste formato)"""
+        data = self.load()
+        data.extend(records)
+        self.save(data)
+    
+    @instrumented("storage.json.update")
+    def update(self, records):
+        """Substitui registros existentes pela chave, mantendo a posição original"""
+        changes = {record_key(record): record for record in records}
+        data = self.load()
+        data = [changes.pop(record_key(item), item) for item in data]
+        data.extend(changes.values())
+        self.save(data)
+    
+    @instrumented("storage.json.delete")
+    def delete(self, keys):
+        """Remove os registros com as chaves (e-mails normalizados) informadas"""
+        keys = set(keys)
+        self.save([record for record in self.load() if record_key(record) not in keys])
+
+class LogStorage:
+    """Motor append-only: snapshot JSON Lines + log de operações com compactação periódica
+    
+    Cada linha do log é uma operação {"op": "put", "data": {...}} ou
+    {"op": "delete", "key": ...}. A leitura aplica o log sobre o snapshot;
+    um "put" de uma chave existente substitui o registro na mesma posição.
+    """
+    
+    def __init__(self, path, compact_every=10000, fsync=False):
+        path = Path(path)
+        self.legacy_path = path
+        self.snapshot_path = path.with_suffix(".snapshot.jsonl")
+        self.log_path = path.with_suffix(".log.jsonl")
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._log_records = None
+        self.migrate_legacy()
+    
+    # ---- Migração -------------------------------------------------------
+    
+    def migrate_legacy(self):
+        """Importa o leads.json (array) para o snapshot na primeira abertura"""
+        if self.snapshot_path.exists() or self.log_path.exists():
+            return False
+        if not self.legacy_path.exists():
+            return False
+        records = JsonFileStorage(self.legacy_path).load()
+        self._write_snapshot(records)
+        return True
+    
+    # ---- Leitura --------------------------------------------------------
+    
+    def signature(self):
+        """Muda sempre que snapshot ou log são modificados"""
+        return (file_signature(self.snapshot_path), file_signature(self.log_path))
+    
+    @instrumented("storage.log.load")
+    def load(self):
+        """Reconstrói o estado atual aplicando o log sobre o snapshot
+        
+        Leitores não usam o lock de gravação. A compactação troca o snapshot
+        e só depois zera o log: lendo o log antes do snapshot, um leitor vê o
+        log antigo (já contido no novo snapshot; reaplicar é idempotente) ou o
+        novo. Se o snapshot mudou durante a leitura, a leitura é refeita.
+        """
+        while True:
+            before = file_signature(self.snapshot_path)
+            entries = self._read_log()
+            state = {}
+            for record in self._read_snapshot():
+                state[record_key(record)] = record
+            if file_signature(self.snapshot_path) == before:
+                break
+        for entry in entries:
+            self._apply(state, entry)
+        self._log_records = len(entries)
+        return list(state.values())
+    
+    def _apply(self, state, entry):
+        if entry.get("op") == "delete":
+            state.pop(entry["key"], None)
+        else:
+            record = entry["data"]
+            state[record_key(record)] = record
+    
+    def _read_snapshot(self):
+        if not self.snapshot_path.exists():
+            return
+        metrics.incr("storage.bytes_read", self.snapshot_path.stat().st_size)
+        with self.snapshot_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    
+    def _read_log(self):
+        """Lê o log ignorando um último registro incompleto (gravação interrompida)"""
+        if not self.log_path.exists():
+            return []
+        raw = self.log_path.read_bytes()
+        metrics.incr("storage.bytes_read", len(raw))
+        lines = raw.split(b"\n")
+        # O último pedaço só é válido se terminar em "\n" (pedaço vazio)
+        lines.pop()
+        entries = []
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line.decode("utf-8")))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                if number == len(lines):
+                    break
+                raise ValueError(f"Log corrompido em {self.log_path} (linha {number})")
+        return entries
+    
+    def scan_plan(self):
+        """Snapshot (JSON Lines) e sobreposição do log, para varreduras paralelas
+        
+        overlay: chave -> registro atual (None se removido), na ordem de load().
+        moved: chaves removidas e recriadas pelo log, que em load() vão para o fim.
+        """
+        overlay = {}
+        moved = set()
+        for entry in self._read_log():
+            if entry.get("op") == "delete":
+                overlay.pop(entry["key"], None)
+                overlay[entry["key"]] = None
+            else:
+                record = entry["data"]
+                key = record_key(record)
+                if key in overlay and overlay[key] is None:
+                    del overlay[key]
+                    moved.add(key)
+                overlay[key] = record
+        return self.snapshot_path, overlay, moved
+    
+    # ---- Escrita --------------------------------------------------------
+    
+    @instrumented("storage.log.save")
+    def save(self, records):
+        """Substitui todo o conteúdo: grava um novo snapshot e zera o log"""
+        self._write_snapshot(records)
+    
+    @instrumented("storage.log.append")
+    def append(self, records):
+        """Adiciona registros com custo O(1) (uma linha por registro no log)"""
+        self._write_log([{"op": "put", "data": record} for record in records])
+    
+    @instrumented("storage.log.update")
+    def update(self, records):
+        """Atualiza registros existentes; no log é a mesma operação de append"""
+        self.append(records)
+    
+    @instrumented("storage.log.delete")
+    def delete(self, keys):
+        """Remove registros pela chave com uma operação "delete" por chave no log"""
+        self._write_log([{"op": "delete", "key": key} for key in keys])
+    
+    @instrumented("storage.log.compact")
+    def compact(self):
+        """Funde log e snapshot em um novo snapshot"""
+        self._write_snapshot(self.load())
+    
+    def _write_log(self, entries):
+        if self._log_records is None:
+            self._log_records = self._count_log_records()
+        self._truncate_torn_tail()
+        payload = "".join(
+            json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries
+        ).encode("utf-8")
+        metrics.incr("storage.bytes_written", len(payload))
+        with self.log_path.open("ab") as f:
+            f.write(payload)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self._log_records += len(entries)
+        if self.compact_every and self._log_records >= self.compact_every:
+            self.compact()
+    
+    def _write_snapshot(self, records):
+        """Grava o snapshot de forma atômica (arquivo temporário + rename)"""
+        tmp_path = temp_path_for(self.snapshot_path)
+        with tmp_path.open("w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            metrics.incr("storage.bytes_written", f.tell())
+        os.replace(tmp_path, self.snapshot_path)
+        # Se o processo cair aqui, o log é reaplicado sobre o novo snapshot
+        # sem efeito colateral: "put" e "delete" são idempotentes.
+        self.log_path.write_text("", encoding="utf-8")
+        self._log_records = 0
+    
+    def _count_log_records(self):
+        if not self.log_path.exists():
+            return 0
+        with self.log_path.open("rb") as f:
+            return sum(1 for line in f if line.strip())
+    
+    def _truncate_torn_tail(self):
+        """Descarta um último registro sem quebra de linha antes de anexar novos"""
+        if not self.log_path.exists():
+            return
+        size = self.log_path.stat().st_size
+        if size == 0:
+            return
+        with self.log_path.open("rb+") as f:
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            f.truncate(f.read().rfind(b"\n") + 1)
+
+# Registros sem data de criação válida ficam nesta partição (a primeira na ordem)
+UNDATED_PARTITION = "sem-data"
+
+def partition_of(record):
+    """Partição (AAAA-MM do campo created) de um registro"""
+    month = (record.get("created") or "")[:7]
+    if len(month) == 7 and month[4] == "-" and month[:4].isdigit() and month[5:].isdigit():
+        return month
+    return UNDATED_PARTITION
+
+class PartitionedStorage:
+    """Um arquivo JSON Lines por mês de criação, mais um manifesto
+    
+    O manifesto (manifest.json) guarda, por partição: arquivo, quantidade de
+    registros, menor e maior data de criação, contagem por estágio e se está
+    arquivada (gzip). Gravações só reescrevem as partições afetadas (um lead
+    novo toca apenas a do mês atual) e o manifesto, sempre por último: a
+    assinatura do motor é a do manifesto.
+    
+    load() devolve as partições em ordem de mês (sem data primeiro) e, dentro
+    de cada uma, na ordem de gravação. iter_records() usa o manifesto para
+    nem abrir partições sem o estágio ou fora da faixa de datas pedidos.
+    """
+    
+    MANIFEST_VERSION = 1
+    
+    def __init__(self, path):
+        path = Path(path)
+        self.legacy_path = path
+        self.directory = path.with_suffix(".partitions")
+        self.manifest_path = self.directory / "manifest.json"
+        self._serializer = get_serializer("jsonl")
+        if not self.migrate_legacy():
+            self._check_manifest()
+    
+    # ---- Migração e manifesto -------------------------------------------
+    
+    def migrate_legacy(self):
+        """Divide o leads.json (array) em partições na primeira abertura"""
+        if self.manifest_path.exists() or not self.legacy_path.exists():
+            return False
+        self.save(JsonFileStorage(self.legacy_path).load())
+        return True
+    
+    def _check_manifest(self):
+        """Reconstrói o manifesto se uma gravação foi interrompida antes dele"""
+        if not self.directory.exists():
+            return
+        partitions = self._read_manifest()
+        files = {path.name for path in self._partition_files()}
+        consistent = files == {entry["file"] for entry in partitions.values()} and all(
+            os.path.getsize(self.directory / entry["file"]) == entry["bytes"]
+            for entry in partitions.values()
+        )
+        if not consistent:
+            self.rebuild_manifest()
+    
+    def _partition_files(self):
+        return [
+            path for path in self.directory.iterdir()
+            if path.name.endswith((".jsonl", ".jsonl.gz")) and not path.name.startswith(".")
+        ]
+    
+    @instrumented("storage.partitioned.rebuild_manifest")
+    def rebuild_manifest(self):
+        """Recalcula o manifesto lendo todos os arquivos de partição"""
+        partitions = {}
+        for path in self._partition_files():
+            archived = path.name.endswith(".gz")
+            name = path.name[:-len(".jsonl.gz")] if archived else path.name[:-len(".jsonl")]
+            raw = path.read_bytes()
+            records = self._serializer.loads(gzip.decompress(raw) if archived else raw)
+            partitions[name] = self._entry(path.name, records, archived, len(raw))
+        self._write_manifest(partitions)
+        return partitions
+    
+    def _read_manifest(self):
+        if not self.manifest_path.exists():
+            return {}
+        data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        if data.get("version") != self.MANIFEST_VERSION:
+            raise ValueError(f"Versão de manifesto não suportada: {data.get('version')}")
+        return data["partitions"]
+    
+    def _write_manifest(self, partitions):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": self.MANIFEST_VERSION,
+            "partitions": {name: partitions[name] for name in self._ordered(partitions)}
+        }
+        atomic_write_text(self.manifest_path, json.dumps(payload, ensure_ascii=False, indent=2))
+    
+    def _entry(self, file, records, archived, size):
+        days = [record.get("created")[:10] for record in records if record.get("created")]
+        return {
+            "file": file,
+            "count": len(records),
+            "min_created": min(days) if days else None,
+            "max_created": max(days) if days else None,
+            "stages": dict(Counter(record.get("stage", "novo") for record in records)),
+            "archived": archived,
+            "bytes": size
+        }
+    
+    @staticmethod
+    def _ordered(partitions):
+        return sorted(partitions, key=lambda name: (name != UNDATED_PARTITION, name))
+    
+    def partitions(self):
+        """Entradas do manifesto (com o nome da partição), na ordem de load()"""
+        partitions = self._read_manifest()
+        return [dict(partitions[name], name=name) for name in self._ordered(partitions)]
+    
+    # ---- Leitura --------------------------------------------------------
+    
+    def signature(self):
+        """Muda a cada gravação: o manifesto é sempre regravado por último"""
+        return file_signature(self.manifest_path)
+    
+    def _read_partition(self, entry):
+        raw = (self.directory / entry["file"]).read_bytes()
+        metrics.incr("storage.bytes_read", len(raw))
+        return self._serializer.loads(gzip.decompress(raw) if entry["archived"] else raw)
+    
+    @instrumented("storage.partitioned.load")
+    def load(self):
+        """Todos os registros, partição a partição"""
+        # Uma partição arquivada (renomeada) durante a leitura: relê o manifesto
+        for _ in range(3):
+            try:
+                return [record for _, record in self.iter_records()]
+            except FileNotFoundError:
+                continue
+        return [record for _, record in self.iter_records()]
+    
+    def iter_records(self, start=0, stage=None, created_from=None, created_to=None):
+        """(posição, registro) na ordem de load(), a partir da posição start
+        
+        Partições sem o estágio ou fora da faixa de datas (segundo o
+        manifesto) não são lidas; as posições continuam as de load(). O
+        chamador ainda filtra registro a registro dentro das partições lidas.
+        """
+        partitions = self._read_manifest()
+        offset = 0
+        for name in self._ordered(partitions):
+            entry = partitions[name]
+            first, offset = offset, offset + entry["count"]
+            if offset <= start or not self._may_match(entry, stage, created_from, created_to):
+                metrics.incr("storage.partitions_pruned")
+                continue
+            for position, record in enumerate(self._read_partition(entry), first):
+                if position >= start:
+                    yield position, record
+    
+    @staticmethod
+    def _may_match(entry, stage, created_from, created_to):
+        if stage is not None and not entry["stages"].get(stage):
+            return False
+        if created_from is None and created_to is None:
+            return True
+        if entry["min_created"] is None:
+            return False
+        if created_from is not None and entry["max_created"] < created_from:
+            return False
+        return created_to is None or entry["min_created"] <= created_to
+    
+    # ---- Escrita --------------------------------------------------------
+    
+    def _group(self, records):
+        groups = {}
+        for record in records:
+            groups.setdefault(partition_of(record), []).append(record)
+        return groups
+    
+    def _write_partition(self, partitions, name, records):
+        """Regrava uma partição (ou a remove, se vazia) e atualiza sua entrada"""
+        entry = partitions.get(name)
+        if not records:
+            if entry is not None:
+                (self.directory / entry["file"]).unlink(missing_ok=True)
+                del partitions[name]
+            return
+        archived = bool(entry and entry["archived"])
+        file = f"{name}.jsonl.gz" if archived else f"{name}.jsonl"
+        data = self._serializer.dumps(records)
+        if archived:
+            data = gzip.compress(data)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(self.directory / file, data)
+        partitions[name] = self._entry(file, records, archived, len(data))
+    
+    @instrumented("storage.partitioned.save")
+    def save(self, records):
+        """Substitui todo o conteúdo, regravando todas as partições"""
+        partitions = self._read_manifest()
+        groups = self._group(records)
+        for name in set(partitions) - set(groups):
+            self._write_partition(partitions, name, [])
+        for name, group in groups.items():
+            self._write_partition(partitions, name, group)
+        self._write_manifest(partitions)
+    
+    @instrumented("storage.partitioned.append")
+    def append(self, records):
+        """Adiciona registros regravando só as partições dos seus meses"""
+        partitions = self._read_manifest()
+        for name, group in self._group(records).items():
+            existing = self._read_partition(partitions[name]) if name in partitions else []
+            self._write_partition(partitions, name, existing + group)
+        self._write_manifest(partitions)
+    
+    @instrumented("storage.partitioned.update")
+    def update(self, records):
+        """Substitui registros pela chave, na posição original dentro da partição
+        
+        Normalmente só a partição do mês de cada registro é lida; as demais
+        só são varridas para registros que mudaram de mês ou não existiam.
+        """
+        partitions = self._read_manifest()
+        changes = {record_key(record): record for record in records}
+        targets = {key: partition_of(record) for key, record in changes.items()}
+        loaded, dirty, found = {}, set(), set()
+        
+        def partition_records(name):
+            if name not in loaded:
+                loaded[name] = self._read_partition(partitions[name]) if name in partitions else []
+            return loaded[name]
+        
+        for name in set(targets.values()):
+            data = partition_records(name)
+            for i, item in enumerate(data):
+                key = record_key(item)
+                if targets.get(key) == name:
+                    data[i] = changes[key]
+                    found.add(key)
+                    dirty.add(name)
+        
+        missing = changes.keys() - found
+        if missing:
+            # Remove a versão antiga de onde estiver e grava na partição nova
+            for name in self._ordered(partitions):
+                data = partition_records(name)
+                kept = [item for item in data if record_key(item) not in missing]
+                if len(kept) != len(data):
+                    loaded[name] = kept
+                    dirty.add(name)
+            for key in changes:
+                if key in missing:
+                    partition_records(targets[key]).append(changes[key])
+                    dirty.add(targets[key])
+        
+        for name in dirty:
+            self._write_partition(partitions, name, loaded[name])
+        self._write_manifest(partitions)
+    
+    @instrumented("storage.partitioned.delete")
+    def delete(self, keys):
+        """Remove registros pela chave; só partições que continham alguma são regravadas"""
+        keys = set(keys)
+        partitions = self._read_manifest()
+        for name in self._ordered(partitions):
+            data = self._read_partition(partitions[name])
+            kept = [record for record in data if record_key(record) not in keys]
+            if len(kept) != len(data):
+                self._write_partition(partitions, name, kept)
+        self._write_manifest(partitions)
+    
+    @instrumented("storage.partitioned.archive")
+    def archive(self, before):
+        """Compacta com gzip as partições de meses anteriores a before (AAAA-MM)
+        
+        Os registros continuam visíveis em load(); só o arquivo muda. Retorna
+        os nomes das partições arquivadas.
+        """
+        partitions = self._read_manifest()
+        archived = []
+        for name in self._ordered(partitions):
+            entry = partitions[name]
+            if name == UNDATED_PARTITION or name >= before or entry["archived"]:
+                continue
+            data = gzip.compress((self.directory / entry["file"]).read_bytes())
+            file = f"{name}.jsonl.gz"
+            atomic_write_bytes(self.directory / file, data)
+            partitions[name] = dict(entry, file=file, archived=True, bytes=len(data))
+            archived.append((name, entry["file"]))
+        if archived:
+            self._write_manifest(partitions)
+            # O arquivo antigo só sai depois que o manifesto aponta para o novo
+            for _, old_file in archived:
+                (self.directory / old_file).unlink(missing_ok=True)
+        return [name for name, _ in archived]
+
+STORAGE_ENGINES = {
+    "json": JsonFileStorage,
+    "log": LogStorage,
+    "partitioned": PartitionedStorage,
+}
+
+def create_storage(engine, path, **options):
+    """Cria o motor de armazenamento pelo nome ou aceita uma instância pronta"""
+    if not isinstance(engine, str):
+        return engine
+    try:
+        engine_class = STORAGE_ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Motor de armazenamento desconhecido: {engine}")
+    return engine_class(path, **options)
\ No newline at end of file